@@ -0,0 +1,61 @@
+"""통계 결과 Arrow 테이블 (한 번 변환해 두고 정렬/그룹/페이지는 로컬에서 처리)"""
+import pyarrow as pa
+
+# 같은 메시지에서 기억할 정렬/그룹 결과 수
+MAX_VIEWS = 8
+
+
+def rows_to_table(rows: list) -> pa.Table:
+    """dict 목록 → Arrow 테이블. 행마다 키가 달라도 되고, 타입이 섞인 열은 문자열로 변환"""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    arrays = {}
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        try:
+            arrays[column] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays[column] = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+    return pa.table(arrays)
+
+
+class AnalyticsTable:
+    """통계 결과 1건의 Arrow 테이블 + 정렬/그룹 결과 캐시 (원본 행 목록은 읽기 전용)"""
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.table = rows_to_table(rows)
+        self._views = {}
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def columns(self) -> list:
+        return self.table.column_names
+
+    def numeric_columns(self, table: pa.Table | None = None) -> list:
+        table = self.table if table is None else table
+        return [f.name for f in table.schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+
+    def view(self, sort_by: str | None = None, descending: bool = False, group_by: str | None = None) -> pa.Table:
+        """그룹(건수 + 숫자 열 합계) → 정렬 순으로 적용한 테이블"""
+        key = (sort_by, descending, group_by)
+        if key not in self._views:
+            table = self.table
+            if group_by:
+                numeric = [c for c in self.numeric_columns() if c != group_by]
+                table = table.group_by(group_by).aggregate(
+                    # 키 열을 세면 null 키 그룹이 0건이 되므로 행 수(count_all)로 셈
+                    [([], "count_all")] + [(c, "sum") for c in numeric]
+                )
+                names = {"count_all": "건수", **{f"{c}_sum": f"{c} 합계" for c in numeric}}
+                table = table.rename_columns([names.get(name, name) for name in table.column_names])
+                # 그룹 키를 첫 열로
+                table = table.select([group_by] + [c for c in table.column_names if c != group_by])
+            if sort_by and sort_by in table.column_names:
+                table = table.sort_by([(sort_by, "descending" if descending else "ascending")])
+            if len(self._views) >= MAX_VIEWS:
+                self._views.pop(next(iter(self._views)))
+            self._views[key] = table
+        return self._views[key]
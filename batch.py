@@ -0,0 +1,263 @@
+"""저장된 쿼리 일괄 실행 (Streamlit 없이 앱과 같은 검색/서머리 경로 사용)
+
+입력 JSONL 한 줄: {"id": "선택", "query": "핀테크 시리즈A", "workspace": "cogp", "limit": 20}
+  workspace: WORKSPACE_ALIASES 별칭 또는 "admin" (생략 시 admin)
+  id: 생략 시 입력 파일의 줄 번호
+  limit: 생략 시 기업 검색은 전체 결과(모든 페이지), 통계는 100행, 재무제표/웹은 전체 응답
+출력 JSONL 한 줄: {"id", "query", "workspace", "status", "description", "summary", "data", "total", "truncated",
+                 "attempts", "elapsed_ms", "error"}
+  total: 응답 meta.total (있을 때), truncated: data에 담긴 행이 total보다 적으면 true
+
+    python batch.py queries.jsonl -o results.jsonl --workers 8 --rate 2
+
+출력 파일이 이미 있으면 성공한 id는 건너뛰고 이어서 기록한다 (중단 후 재실행).
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from benchmarks.bench import load_app
+from export import EXPORT_PAGE_SIZE
+
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0  # 워크스페이스별 초당 요청 수
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+
+# 다시 시도할 응답 상태 (그 외 4xx는 쿼리 문제라 재시도하지 않음)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """토큰 버킷. acquire()는 토큰이 생길 때까지 대기. 스레드 안전."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def read_jobs(path: str) -> list:
+    """입력 JSONL → 작업 목록 (빈 줄 무시, id 없으면 줄 번호)"""
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            job["id"] = str(job.get("id", line_no))
+            job.setdefault("workspace", "admin")
+            jobs.append(job)
+    return jobs
+
+
+def read_done(path: str) -> set:
+    """이미 기록된 출력에서 성공(200)한 id 집합. 잘린 마지막 줄은 무시"""
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("status") == 200:
+                    done.add(str(record["id"]))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class BatchRunner:
+    """작업을 제한된 스레드 풀에서 실행하고 끝나는 순서대로 출력에 기록"""
+
+    def __init__(self, app, out, workers: int, rate: float, retries: int, backoff: float, raw: bool = False):
+        self.app = app
+        self.client = app.get_search_client()
+        self.out = out
+        self.workers = workers
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.raw = raw
+        if raw:
+            # 원본 기록 시에는 렌더러용 필드 선택 없이 전체 필드 요청
+            self.client.fields = None
+        self._limiters = {}
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+
+    def limiter(self, workspace: str) -> RateLimiter:
+        with self._lock:
+            if workspace not in self._limiters:
+                self._limiters[workspace] = RateLimiter(self.rate)
+            return self._limiters[workspace]
+
+    def workspace_id(self, alias: str) -> str | None:
+        """별칭 → workspace_id (admin은 None)"""
+        alias = alias.strip().lower()
+        if alias == "admin":
+            return None
+        if alias not in self.app.WORKSPACE_ALIASES:
+            raise ValueError(f"존재하지 않는 워크스페이스입니다: {alias}")
+        return self.app.WORKSPACE_ALIASES[alias]
+
+    def run_job(self, job: dict) -> dict:
+        """작업 1건 실행 (일시적 오류는 지수 백오프로 재시도)"""
+        record = {"id": job["id"], "query": job["query"], "workspace": job["workspace"]}
+        try:
+            workspace_id = self.workspace_id(job["workspace"])
+        except ValueError as e:
+            return {**record, "status": None, "attempts": 0, "error": str(e)}
+
+        # limit이 없으면 기업 검색은 모든 페이지, 그 외는 경로 타입별 기본값 (통계 100행, 재무제표/웹은 전체)
+        limit = job.get("limit")
+        started = time.perf_counter()
+        for attempt in range(1, self.retries + 2):
+            self.limiter(job["workspace"]).acquire()
+            try:
+                result = self.fetch(job["query"], workspace_id, limit, self.limiter(job["workspace"]))
+                error = None
+                if result["status"] not in RETRY_STATUSES:
+                    break
+                error = f"HTTP {result['status']}"
+            except requests.RequestException as e:
+                result, error = None, f"네트워크 오류: {e}"
+            if attempt <= self.retries:
+                with self._lock:
+                    self.retried += 1
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+        record.update(attempts=attempt, elapsed_ms=(time.perf_counter() - started) * 1000)
+        if result is None:
+            return {**record, "status": None, "error": error}
+
+        data, status = result["data"], result["status"]
+        results = data.get("results") or []
+        total = data.get("meta", {}).get("total")
+        rows = len(data.get("data") or []) if data.get("type") == "analytics" else len(results)
+        summary = None
+        if status == 200 and data.get("type") is None and results:
+            summary = self.app.generate_summary(results, data.get("meta", {}))
+        return {
+            **record,
+            "status": status,
+            "description": self.app.describe_response(data, status),
+            "summary": summary,
+            "data": data if self.raw else self.app.compact_response(data),
+            "total": total,
+            "truncated": total is not None and rows < total,
+            "error": error if status != 200 else None,
+        }
+
+    def fetch(self, query: str, workspace_id: str | None, limit: int | None, limiter: RateLimiter) -> dict:
+        """검색 1회. limit 없는 기업 검색이 첫 페이지에 다 안 담기면 나머지 페이지까지 받아 합침"""
+        result = self.client.search(query, workspace_id, limit=limit)
+        data = result["data"]
+        results = data.get("results") or []
+        if (
+            limit is not None
+            or result["status"] != 200
+            or data.get("type") is not None
+            or data.get("meta", {}).get("total", 0) <= len(results)
+        ):
+            return result
+        # 페이지 요청도 워크스페이스 요청률 제한을 따름 (오류는 작업 재시도로 처리)
+        pages = self.client.iter_pages(query, workspace_id, page_size=EXPORT_PAGE_SIZE)
+        results = []
+        while True:
+            limiter.acquire()
+            page = next(pages, None)
+            if page is None:
+                break
+            results.extend(page)
+        return {**result, "data": {**data, "results": results}}
+
+    def write(self, record: dict):
+        with self._lock:
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.out.flush()
+            if record.get("status") == 200:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def run(self, jobs: list, progress=None):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as executor:
+            futures = {executor.submit(self.run_job, job): job for job in jobs}
+            for i, future in enumerate(as_completed(futures), 1):
+                try:
+                    record = future.result()
+                except Exception as e:
+                    job = futures[future]
+                    record = {"id": job["id"], "query": job["query"], "workspace": job["workspace"],
+                              "status": None, "error": f"{type(e).__name__}: {e}"}
+                self.write(record)
+                if progress is not None:
+                    progress(i, len(jobs), record)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="저장된 쿼리 일괄 실행")
+    parser.add_argument("input", help="쿼리 JSONL")
+    parser.add_argument("-o", "--output", required=True, help="결과 JSONL (있으면 이어서 기록)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시 실행 수")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="워크스페이스별 초당 요청 수")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF, help="첫 재시도 대기(초), 이후 2배씩")
+    parser.add_argument("--raw", action="store_true", help="응답 원본 전체 기록 (기본: 렌더링 필드만)")
+    parser.add_argument("--quiet", action="store_true", help="진행 상황 출력 안 함")
+    args = parser.parse_args(argv)
+
+    jobs = read_jobs(args.input)
+    done = read_done(args.output)
+    pending = [job for job in jobs if job["id"] not in done]
+    if done:
+        print(f"이전 실행에서 완료된 {len(jobs) - len(pending)}건 건너뜀", file=sys.stderr)
+
+    app = load_app()
+    started = time.monotonic()
+
+    def progress(i: int, total: int, record: dict):
+        if args.quiet:
+            return
+        elapsed = time.monotonic() - started
+        eta = elapsed / i * (total - i)
+        mark = "✓" if record.get("status") == 200 else "✗"
+        print(
+            f"[{i}/{total}] {mark} {record['id']} · 성공 {runner.succeeded} · 실패 {runner.failed} · "
+            f"재시도 {runner.retried} · 남은 시간 {eta:.0f}s",
+            file=sys.stderr,
+        )
+
+    with open(args.output, "a", encoding="utf-8") as out:
+        runner = BatchRunner(app, out, args.workers, args.rate, args.retries, args.backoff, raw=args.raw)
+        runner.run(pending, progress)
+
+    print(f"완료: 성공 {runner.succeeded} · 실패 {runner.failed} · {time.monotonic() - started:.1f}s", file=sys.stderr)
+    return 1 if runner.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""로컬 대역 서버 기준 성능 벤치마크
+
+call_search_api(HTTP 왕복 + 파싱, 평균 전송량/디코딩 시간 포함), generate_summary, render_response(헤드리스)를
+응답 타입 × 결과 수 조합별로 반복 실행하고 처리량과 p50/p95/p99(ms)를 보고한다.
+
+    python -m benchmarks.bench --iterations 50 --latency-ms 20 --out bench.json
+    python -m benchmarks.bench --baseline bench.json   # 기준 대비 변화율 표시
+    python -m benchmarks.bench --no-compress --full-fields --sizes 1000   # 압축/필드 선택 없이 비교
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit.config
+import streamlit.logger
+
+from benchmarks.mock_backend import RESPONSE_TYPES, SIZES, MockBackend, load_recordings
+
+# p95가 기준보다 이 비율 이상 느려지면 회귀로 표시
+REGRESSION_THRESHOLD = 0.10
+
+
+def percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(fn, iterations: int, concurrency: int = 1) -> dict:
+    """fn(i)를 반복 실행한 소요 시간 통계 (첫 호출은 지연 import 등이 섞이므로 제외)"""
+    fn(-1)
+
+    def timed(i):
+        started = time.perf_counter()
+        fn(i)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(timed, range(iterations)))
+    else:
+        samples = [timed(i) for i in range(iterations)]
+    wall = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / wall if wall else 0.0,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
+
+
+def load_app(api_url: str | None = None):
+    """Streamlit 없이(bare 모드) 앱 모듈 import (batch.py도 사용)
+
+    api_url이 있으면 대역 서버 기준으로 설정하고, 없으면 secrets/환경 변수 설정을 그대로 쓴다.
+    """
+    if api_url is not None:
+        os.environ["SUPABASE_API_URL"] = api_url
+        os.environ.setdefault("SUPABASE_ANON_KEY", "bench")
+        # 오류 응답 벤치마크가 재시도 대기 시간을 재지 않도록
+        os.environ.setdefault("SEARCH_MAX_RETRIES", "0")
+    # bare 모드에서 st.* 호출마다 나오는 ScriptRunContext 경고 숨김
+    # (설정을 처음 읽을 때 로그 레벨을 다시 지정하므로 설정을 먼저 읽힘)
+    streamlit.config.get_config_options()
+    streamlit.logger.set_log_level("error")
+
+    import streamlit_app
+
+    # 관리자 세션으로 실행 (워크스페이스 헤더 없음)
+    streamlit_app.st.session_state.is_admin = True
+    return streamlit_app
+
+
+def run(app, types: list, sizes: list, iterations: int, concurrency: int) -> dict:
+    results = {}
+    for kind in types:
+        for size in sizes:
+            query = f"{kind}:{size}"
+            response = app.call_search_api(query, limit=size)
+            data, status = response["data"], response["status"]
+
+            wire = []  # (전송 바이트, 디코딩 ms)
+
+            # 매번 다른 쿼리로 결과 캐시를 우회해 실제 왕복 시간을 측정
+            def api(i, query=query, size=size, wire=wire):
+                result = app.call_search_api(f"{query}#{time.perf_counter_ns()}-{i}", limit=size)
+                wire.append((result["bytes"].get("wire") or 0, result["timings"].get("decode_ms", 0.0)))
+
+            cases = {"call_search_api": measure(api, iterations, concurrency)}
+            cases["call_search_api"].update(
+                wire_kb=sum(b for b, _ in wire) / len(wire) / 1024,
+                decode_ms=sum(ms for _, ms in wire) / len(wire),
+            )
+            if status == 200 and data.get("type") is None and data.get("results"):
+                cases["generate_summary"] = measure(
+                    lambda i: app.generate_summary(data["results"], data.get("meta", {})), iterations
+                )
+            cases["render_response"] = measure(lambda i: app.render_response(data, status), iterations)
+
+            for name, stats in cases.items():
+                results[f"{name}/{kind}/{size}"] = stats
+    return results
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """기준 대비 p95 변화율. 반환: [(케이스, 기준 p95, 현재 p95, 변화율)]"""
+    rows = []
+    for case, stats in results.items():
+        base = baseline.get(case)
+        if base and base["p95"]:
+            rows.append((case, base["p95"], stats["p95"], stats["p95"] / base["p95"] - 1))
+    return rows
+
+
+def print_report(results: dict, baseline: dict | None):
+    changes = {case: change for case, _, _, change in compare(results, baseline or {})}
+    print(f"{'case':<40} {'ops/s':>10} {'p50':>9} {'p95':>9} {'p99':>9} {'Δp95':>8} {'wire KB':>9} {'decode':>8}")
+    for case, stats in results.items():
+        change = changes.get(case)
+        delta = "" if change is None else f"{change:+.0%}"
+        if change is not None and change > REGRESSION_THRESHOLD:
+            delta += " !"
+        wire = f"{stats['wire_kb']:>9.1f} {stats['decode_ms']:>8.2f}" if "wire_kb" in stats else ""
+        print(
+            f"{case:<40} {stats['ops_per_sec']:>10.1f} {stats['p50']:>9.2f} "
+            f"{stats['p95']:>9.2f} {stats['p99']:>9.2f} {delta:>8} {wire}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 대역 서버 기준 성능 벤치마크")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=1, help="call_search_api 동시 실행 수")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="대역 서버 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--stream", action="store_true", help="NDJSON 스트리밍 응답으로 측정")
+    parser.add_argument("--recordings", help="녹화 응답 디렉터리 (<타입>_<결과 수>.json)")
+    parser.add_argument("--types", nargs="+", default=list(RESPONSE_TYPES), choices=RESPONSE_TYPES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--no-compress", action="store_true", help="대역 서버 gzip 압축 끔")
+    parser.add_argument("--full-fields", action="store_true", help="필드 선택(fields) 없이 전체 필드 요청")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    args = parser.parse_args(argv)
+
+    with MockBackend(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        stream=args.stream,
+        recordings=load_recordings(args.recordings) if args.recordings else None,
+        compress=not args.no_compress,
+    ) as backend:
+        if args.full_fields:
+            os.environ["FIELD_PROJECTION"] = "0"
+        app = load_app(backend.url)
+        results = run(app, args.types, args.sizes, args.iterations, args.concurrency)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_report(results, baseline)
+
+    if args.out:
+        report = {
+            "created": time.time(),
+            "python": sys.version.split()[0],
+            "config": vars(args),
+            "results": results,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    regressions = [row for row in compare(results, baseline or {}) if row[3] > REGRESSION_THRESHOLD]
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""다중 세션 부하 테스트 (실제 Streamlit 서버에 웹소켓 세션 N개 동시 접속)
+
+`streamlit run`으로 앱 서버를 띄우고, 브라우저 대신 웹소켓으로 로그인 + 채팅 턴을 보내는
+세션을 단계적으로 늘리며 리런 지연(p50/p95/p99), 서버 RSS(세션당 증가량 포함),
+리런당 서버 CPU 시간, 처리량(리런/초)을 측정하고 처리량이 더 늘지 않는 지점(포화점)을 보고한다.
+검색 API는 로컬 대역 서버(mock_backend)로 대체한다.
+
+    python -m benchmarks.load_test --levels 1 2 4 8 16 --turns 5 --latency-ms 50
+
+웹소켓 클라이언트로 websockets 패키지가 필요하다 (pip install websockets).
+서버 RSS/CPU는 /proc에서 읽으므로 Linux에서만 측정된다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from benchmarks.bench import percentile
+from benchmarks.mock_backend import MockBackend
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover
+    websockets = None
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+
+# 세션마다 반복하는 채팅 턴 (mock_backend 쿼리 형식)
+DEFAULT_SCRIPT = ("startup:10", "financial:1", "startup:100", "analytics:10", "web:10")
+DEFAULT_LEVELS = (1, 2, 4, 8, 16)
+
+# 부하 테스트 세션이 로그인할 워크스페이스 (비밀번호 없는 별칭). 세션 번호 순으로 돌아가며 사용
+WORKSPACES = ("cogp", "gp", "gp2", "cogp2", "cogp3")
+
+# 처리량이 직전 단계보다 이 비율 이상 늘지 않으면 포화로 판단
+SATURATION_GAIN = 0.10
+
+SERVER_START_TIMEOUT = 30
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    """앱 서버 실행 후 헬스 체크가 통과할 때까지 대기"""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--browser.gatherUsageStats", "false",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Streamlit 서버가 시작되지 않았습니다.")
+
+
+def process_usage(pid: int) -> tuple[int, float]:
+    """프로세스 (RSS bytes, 누적 CPU 초). /proc이 없으면 (0, 0.0)"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        with open(f"/proc/{pid}/stat") as f:
+            # 프로세스 이름에 공백이 있을 수 있으므로 ")" 뒤부터 파싱
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        return rss, cpu
+    except (OSError, ValueError, IndexError):
+        return 0, 0.0
+
+
+class Session:
+    """브라우저 탭 1개에 해당하는 웹소켓 세션"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.widgets = {}  # 위젯 종류 -> [위젯 ID] (마지막 리런 기준)
+        self._ws = None
+
+    async def connect(self):
+        self._ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        await self._ws.close()
+
+    async def rerun(self, widget_states: list | None = None) -> tuple[float, int]:
+        """리런 요청 후 스크립트 실행이 끝날 때까지 대기. 반환: (소요 ms, 예외 요소 수)"""
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        for state in widget_states or []:
+            message.rerun_script.widget_states.widgets.append(state)
+
+        started = time.perf_counter()
+        await self._ws.send(message.SerializeToString())
+
+        widgets, errors = {}, 0
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self._ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    errors += 1
+                element_id = getattr(getattr(element, element_type), "id", "")
+                if element_id:
+                    widgets.setdefault(element_type, []).append(element_id)
+            # st.rerun()으로 중단된 실행은 이어지는 실행까지 기다림
+            elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+
+        self.widgets = widgets
+        return (time.perf_counter() - started) * 1000, errors
+
+    async def login(self, alias: str, password: str = ""):
+        await self.rerun()
+        alias_id, password_id = self.widgets["text_input"][:2]
+        states = [
+            self._state(alias_id, "string_value", alias),
+            self._state(password_id, "string_value", password),
+            self._state(self.widgets["button"][0], "trigger_value", True),
+        ]
+        _, errors = await self.rerun(states)
+        if errors or "chat_input" not in self.widgets:
+            raise RuntimeError(f"{alias} 로그인 실패")
+
+    async def chat(self, query: str) -> tuple[float, int]:
+        state = self._state(self.widgets["chat_input"][0])
+        state.chat_input_value.data = query
+        return await self.rerun([state])
+
+    @staticmethod
+    def _state(widget_id: str, field: str | None = None, value=None):
+        message = BackMsg()
+        state = message.rerun_script.widget_states.widgets.add()
+        state.id = widget_id
+        if field is not None:
+            setattr(state, field, value)
+        return state
+
+
+async def run_session(session: Session, number: int, script: list, turns: int) -> dict:
+    """채팅 턴 실행. 반환: {"latencies": [리런 ms], "errors": 예외 건수}"""
+    latencies, errors = [], 0
+    for turn in range(turns):
+        query = script[turn % len(script)]
+        # 세션/턴마다 쿼리를 바꿔 결과 캐시 적중 없이 매번 업스트림까지 요청
+        ms, turn_errors = await session.chat(f"{query}#{number}-{turn}")
+        latencies.append(ms)
+        errors += turn_errors
+    return {"latencies": latencies, "errors": errors}
+
+
+async def run_level(url: str, pid: int, sessions: int, script: list, turns: int) -> dict:
+    """동시 세션 sessions개로 한 단계 측정"""
+    rss_before, _ = process_usage(pid)
+    clients = [Session(url) for _ in range(sessions)]
+    await asyncio.gather(*(client.connect() for client in clients))
+    await asyncio.gather(*(
+        client.login(WORKSPACES[i % len(WORKSPACES)]) for i, client in enumerate(clients)
+    ))
+
+    _, cpu_before = process_usage(pid)
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(
+        run_session(client, i, script, turns) for i, client in enumerate(clients)
+    ))
+    wall = time.perf_counter() - started
+    # 세션이 연결된 상태에서 측정
+    rss_after, cpu_after = process_usage(pid)
+    await asyncio.gather(*(client.close() for client in clients))
+
+    latencies = [ms for outcome in outcomes for ms in outcome["latencies"]]
+    reruns = len(latencies)
+    return {
+        "sessions": sessions,
+        "reruns": reruns,
+        "errors": sum(outcome["errors"] for outcome in outcomes),
+        "reruns_per_sec": reruns / wall if wall else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "cpu_ms_per_rerun": (cpu_after - cpu_before) * 1000 / reruns if reruns else 0.0,
+        "rss_mb": rss_after / 1024 / 1024,
+        "rss_mb_per_session": max(0, rss_after - rss_before) / 1024 / 1024 / sessions,
+    }
+
+
+def find_saturation(levels: list) -> int | None:
+    """처리량 증가가 SATURATION_GAIN 미만으로 떨어지기 직전 단계의 세션 수"""
+    for previous, level in zip(levels, levels[1:]):
+        if level["reruns_per_sec"] < previous["reruns_per_sec"] * (1 + SATURATION_GAIN):
+            return previous["sessions"]
+    return None
+
+
+def print_report(levels: list, saturation: int | None):
+    print(
+        f"{'sessions':>8} {'reruns/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'cpu ms':>8} {'rss MB':>8} {'MB/sess':>8} {'errors':>6}"
+    )
+    for level in levels:
+        print(
+            f"{level['sessions']:>8} {level['reruns_per_sec']:>9.1f} {level['p50']:>8.1f} "
+            f"{level['p95']:>8.1f} {level['p99']:>8.1f} {level['cpu_ms_per_rerun']:>8.1f} "
+            f"{level['rss_mb']:>8.1f} {level['rss_mb_per_session']:>8.2f} {level['errors']:>6}"
+        )
+    if saturation is None:
+        print("포화점: 측정 범위 안에서 처리량이 계속 증가")
+    else:
+        print(f"포화점: 동시 세션 {saturation}개 이후 처리량 증가 {SATURATION_GAIN:.0%} 미만")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="다중 세션 부하 테스트")
+    parser.add_argument("--levels", nargs="+", type=int, default=list(DEFAULT_LEVELS), help="단계별 동시 세션 수")
+    parser.add_argument("--turns", type=int, default=5, help="세션당 채팅 턴 수")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="대역 서버 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--stream", action="store_true", help="NDJSON 스트리밍 응답")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    if websockets is None:
+        parser.error("websockets 패키지가 필요합니다 (pip install websockets)")
+
+    with MockBackend(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, stream=args.stream) as backend:
+        port = free_port()
+        env = {
+            **os.environ,
+            "SUPABASE_API_URL": backend.url,
+            "SUPABASE_ANON_KEY": os.environ.get("SUPABASE_ANON_KEY", "load-test"),
+            # 부하 테스트 턴이 운영 메트릭 파일에 섞이지 않도록
+            "METRICS_DIR": tempfile.mkdtemp(prefix="lattice_load_"),
+        }
+        server = start_server(port, env)
+        try:
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            # 첫 리런의 지연 import/캐시 생성이 첫 단계 측정에 섞이지 않도록 한 번 실행
+            asyncio.run(run_level(url, server.pid, 1, list(DEFAULT_SCRIPT), len(DEFAULT_SCRIPT)))
+            levels = [
+                asyncio.run(run_level(url, server.pid, sessions, list(DEFAULT_SCRIPT), args.turns))
+                for sessions in args.levels
+            ]
+        finally:
+            server.terminate()
+            server.wait()
+
+    saturation = find_saturation(levels)
+    print_report(levels, saturation)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {"created": time.time(), "config": vars(args), "levels": levels, "saturation": saturation},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""벤치마크용 로컬 검색 API 대역 서버 (합성/녹화 응답 재생)
+
+쿼리 형식: "<응답 타입>:<결과 수>[#임의 문자열]"  예) "startup:100#42"
+  응답 타입: startup, analytics, financial, web, error
+  "#" 뒤는 무시 (결과 캐시를 피하려고 쿼리를 바꿀 때 사용)
+목록 응답은 offset/limit 또는 cursor/limit으로 나눠 보내고, 남은 행이 있으면 meta.next_cursor를 붙인다.
+요청 payload에 "fields"(응답 타입별 필드 목록)가 있으면 그 필드만 응답하고,
+Accept-Encoding에 gzip이 있으면 압축해서 보낸다 (--no-compress로 끔).
+
+스냅샷: GET /snapshot → {"version", "companies": [합성 기업 SNAPSHOT_SIZE건]} (gzip 지원)
+
+녹화 응답: --recordings 디렉터리의 "<응답 타입>_<결과 수>.json" 파일이 있으면 합성 응답 대신 사용
+
+    python -m benchmarks.mock_backend --port 8765 --latency-ms 50
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSE_TYPES = ("startup", "analytics", "financial", "web", "error")
+SIZES = (1, 10, 100, 1000)
+SNAPSHOT_SIZE = 1000
+
+INDUSTRIES = ("핀테크", "헬스케어", "에듀테크", "모빌리티", "커머스", "AI")
+REGIONS = ("서울", "경기", "부산", "대전", "해외")
+ROUNDS = ("seed", "pre_a", "series_a", "series_b")
+STAGES = ("discovery", "review", "due_diligence", "investment", "portfolio")
+
+FINANCIAL_FIELDS = (
+    "revenue", "cost_of_sales", "gross_profit", "selling_general_administrative_expenses",
+    "operating_profit", "non_operating_income", "non_operating_expenses",
+    "profit_before_tax_expense", "income_tax_expense", "net_income",
+    "current_assets", "quick_assets", "inventory_assets", "non_current_assets",
+    "investment_assets", "tangible_assets", "intangible_assets", "other_non_current_assets",
+    "total_assets", "current_liabilities", "non_current_liabilities", "total_liabilities",
+    "capital", "capital_surplus", "capital_adjustment", "accumulated_other_comprehensive_income",
+    "retained_earnings", "deficit", "total_equity",
+)
+
+
+def parse_query(query: str) -> tuple[str, int]:
+    """쿼리 → (응답 타입, 결과 수). 형식이 맞지 않으면 startup 10건"""
+    spec = query.split("#", 1)[0].strip()
+    kind, _, size = spec.partition(":")
+    if kind not in RESPONSE_TYPES:
+        return "startup", 10
+    return kind, int(size) if size.isdigit() else 10
+
+
+def make_company(i: int) -> dict:
+    return {
+        "name": f"기업{i:04d}",
+        "industry": INDUSTRIES[i % len(INDUSTRIES)],
+        "region": REGIONS[i % len(REGIONS)],
+        "round": ROUNDS[i % len(ROUNDS)],
+        # 지역과 개수가 같아 i % 5로 두면 지역마다 단계가 하나로 고정되므로 어긋나게 배치
+        "stage": STAGES[i // len(REGIONS) % len(STAGES)],
+        "ceo_name": f"대표{i}",
+        "ceo_gender": "F" if i % 3 == 0 else "M",
+        "sourcing_channel": "inbound" if i % 2 else "network",
+        "summary": f"기업{i:04d}는 {INDUSTRIES[i % len(INDUSTRIES)]} 분야 스타트업입니다. " * 3,
+        "investment_date": f"202{i % 5}-{i % 12 + 1:02d}-15",
+        "pre_money_valuation": (i % 97 + 1) * 1_000_000_000,
+        "is_capital_impaired": i % 7 == 0,
+        "has_exit": i % 11 == 0,
+        # 화면에서 쓰지 않는 필드 (실제 레코드처럼 필드 선택 시 빠지는 부분)
+        "homepage": f"https://example.com/companies/{i}",
+        "description": f"기업{i:04d} 상세 소개. 주요 제품, 팀 구성, 투자 이력, 재무 현황을 포함합니다. " * 8,
+    }
+
+
+def project(payload: dict, fields: dict) -> dict:
+    """요청 "fields"에 맞춰 응답 필드 축소"""
+    def pick(record: dict, names) -> dict:
+        return {k: v for k, v in record.items() if k in names}
+
+    kind = payload.get("type")
+    if kind is None and "results" in payload and "company" in fields:
+        return {**payload, "results": [pick(c, fields["company"]) for c in payload["results"]]}
+    if kind == "web" and "web" in fields:
+        return {**payload, "results": [pick(r, fields["web"]) for r in payload["results"]]}
+    if kind == "financial" and "financial" in fields:
+        return {
+            **payload,
+            **{part: pick(payload.get(part, {}), names) for part, names in fields["financial"].items()},
+        }
+    return payload
+
+
+def make_payload(kind: str, size: int) -> tuple[int, dict]:
+    """합성 응답 (상태 코드, 본문)"""
+    if kind == "error":
+        return 500, {"error": {"code": "INTERNAL", "message": "벤치마크용 오류 응답"}}
+    if kind == "analytics":
+        return 200, {
+            "type": "analytics",
+            "data": [
+                {"industry": INDUSTRIES[i % len(INDUSTRIES)], "region": REGIONS[i % len(REGIONS)], "count": i + 1}
+                for i in range(size)
+            ],
+            "meta": {"description": f"산업/지역별 기업 수 ({size}행)", "total": size},
+        }
+    if kind == "financial":
+        # 재무제표는 기업 1곳 기준이라 결과 수는 값 크기에만 반영
+        values = {field: (i + 1) * size * 10_000_000 for i, field in enumerate(FINANCIAL_FIELDS)}
+        return 200, {
+            "type": "financial",
+            "company": {"name": "기업0000"},
+            "period": {"year": 2024, "quarter": "Q4"},
+            "summary": values,
+            "full": values,
+            "meta": {"is_capital_impaired": False, "updated_at": "2025-01-31T00:00:00Z"},
+        }
+    if kind == "web":
+        return 200, {
+            "type": "web",
+            "results": [
+                {
+                    "title": f"검색 결과 {i}",
+                    "link": f"https://example.com/articles/{i}",
+                    "snippet": "벤치마크용 웹 검색 스니펫입니다. " * 4,
+                }
+                for i in range(size)
+            ],
+            "meta": {"query": f"web:{size}"},
+        }
+    return 200, {
+        "results": [make_company(i) for i in range(size)],
+        "meta": {
+            "total": size,
+            "route_type": "filter",
+            "matched_conditions": {"industry": "핀테크", "region": "서울"},
+        },
+    }
+
+
+def load_recordings(directory: str) -> dict:
+    """녹화 응답 로드: {(응답 타입, 결과 수): (상태 코드, 본문)}"""
+    recordings = {}
+    for filename in os.listdir(directory):
+        stem, ext = os.path.splitext(filename)
+        kind, _, size = stem.partition("_")
+        if ext != ".json" or kind not in RESPONSE_TYPES or not size.isdigit():
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            body = json.load(f)
+        recordings[(kind, int(size))] = (500 if kind == "error" else 200, body)
+    return recordings
+
+
+class MockBackend:
+    """스레드로 도는 대역 서버. latency_ms ± jitter_ms 만큼 응답을 지연"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        stream: bool = False,
+        recordings: dict | None = None,
+        compress: bool = True,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stream = stream
+        self.compress = compress
+        self.recordings = recordings or {}
+        self.requests = 0
+        self._bodies = {}  # (응답 타입, 결과 수) -> (상태 코드, 본문) 캐시
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockBackend":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def payload(self, kind: str, size: int) -> tuple[int, dict]:
+        key = (kind, size)
+        with self._lock:
+            if key not in self._bodies:
+                self._bodies[key] = self.recordings.get(key) or make_payload(kind, size)
+            return self._bodies[key]
+
+    def delay(self) -> float:
+        """이번 요청의 지연(초)"""
+        ms = self.latency_ms
+        if self.jitter_ms:
+            ms += random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(ms, 0.0) / 1000
+
+    def _handler_class(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 헤더/본문을 나눠 쓸 때 지연 ACK로 40ms씩 밀리지 않도록
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with backend._lock:
+                    backend.requests += 1
+
+                started = time.perf_counter()
+                time.sleep(backend.delay())
+                query = body.get("query", "")
+                status, payload = backend.payload(*parse_query(query))
+
+                # 재무제표는 "#" 뒤 문자열을 기업명으로 사용 (비교 화면 확인용)
+                if payload.get("type") == "financial" and "#" in query:
+                    payload = {**payload, "company": {"name": query.split("#", 1)[1]}}
+
+                # 스타트업 결과 / 통계 행은 offset(또는 cursor)/limit 페이지 단위로 응답
+                rows_field = {None: "results", "analytics": "data"}.get(payload.get("type"))
+                if rows_field in payload:
+                    rows = payload[rows_field]
+                    offset = int(body.get("cursor") or body.get("offset") or 0)
+                    limit = body.get("limit")
+                    end = offset + int(limit) if limit else len(rows)
+                    meta = payload.get("meta", {})
+                    if end < len(rows):
+                        meta = {**meta, "next_cursor": str(end)}
+                    payload = {**payload, rows_field: rows[offset:end], "meta": meta}
+                if body.get("fields"):
+                    payload = project(payload, body["fields"])
+
+                server_ms = (time.perf_counter() - started) * 1000
+                accept = self.headers.get("Accept", "")
+                if backend.stream and status == 200 and "application/x-ndjson" in accept:
+                    self._send_stream(payload, server_ms)
+                else:
+                    self._send_json(status, payload, server_ms, compress=self._accepts_gzip())
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/snapshot":
+                    self.send_error(404)
+                    return
+                with backend._lock:
+                    backend.requests += 1
+                payload = {"version": "mock-1", "companies": [make_company(i) for i in range(SNAPSHOT_SIZE)]}
+                self._send_json(200, payload, 0.0, compress=self._accepts_gzip())
+
+            def _accepts_gzip(self) -> bool:
+                return backend.compress and "gzip" in self.headers.get("Accept-Encoding", "")
+
+            def _send_json(self, status: int, payload: dict, server_ms: float, compress: bool = False):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if compress:
+                    data = gzip.compress(data, compresslevel=6)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Server-Timing", f"total;dur={server_ms:.1f}")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, payload: dict, server_ms: float):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Server-Timing", f"total;dur={server_ms:.1f}")
+                self.end_headers()
+
+                if "results" in payload and payload.get("type") is None:
+                    events = [("meta", payload.get("meta", {}))]
+                    events += [("result", company) for company in payload["results"]]
+                else:
+                    events = [("payload", payload)]
+                events.append(("done", None))
+
+                for event, value in events:
+                    line = (json.dumps({"event": event, "data": value}, ensure_ascii=False) + "\n").encode("utf-8")
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 로컬 검색 API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--stream", action="store_true", help="NDJSON 스트리밍 응답")
+    parser.add_argument("--recordings", help="녹화 응답 디렉터리")
+    parser.add_argument("--no-compress", action="store_true", help="gzip 압축 응답 끔")
+    args = parser.parse_args()
+
+    backend = MockBackend(
+        args.host,
+        args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        stream=args.stream,
+        recordings=load_recordings(args.recordings) if args.recordings else None,
+        compress=not args.no_compress,
+    )
+    print(f"mock backend: {backend.url}")
+    try:
+        backend._server.serve_forever()
+    except KeyboardInterrupt:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
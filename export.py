@@ -0,0 +1,178 @@
+"""검색 결과 전체 내보내기 (커서 페이지 → CSV/XLSX 행 단위 스트리밍)
+
+행은 받는 대로 임시 파일에 기록하므로 내보내는 동안 전체 결과를 메모리에 두지 않는다.
+단, 다운로드할 때는 Streamlit이 완성된 파일 전체를 bytes로 읽어 서버 메모리(미디어 파일
+관리자)에 보관하므로, 파일 크기만큼의 메모리는 여전히 필요하다 (DEFAULT_MAX_ROWS로 제한).
+"""
+import csv
+import os
+import tempfile
+import threading
+import weakref
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # pragma: no cover
+    Workbook = None
+
+# 내보내기 페이지 크기 (화면 페이지보다 크게 잡아 왕복 횟수를 줄임)
+EXPORT_PAGE_SIZE = 500
+
+# 한 번에 내보내는 최대 행 수 (다운로드 시 파일 전체가 메모리에 올라가므로 제한)
+DEFAULT_MAX_ROWS = 50_000
+
+# 항상 내보내는 열 (라벨, 필드)
+BASE_COLUMNS = [
+    ("기업명", "name"),
+    ("산업", "industry"),
+    ("지역", "region"),
+    ("라운드", "round"),
+    ("단계", "stage"),
+    ("대표", "ceo_name"),
+    ("투자일", "investment_date"),
+    ("Pre-money(원)", "pre_money_valuation"),
+    ("기술", "technologies"),
+    ("요약", "summary"),
+]
+
+# 형식 → (확장자, MIME)
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "XLSX": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def dynamic_fields(company: dict, matched_conditions: dict) -> list:
+    """matched_conditions에 따라 추가로 보여주는 필드 [(라벨, 값)] (기업 카드와 내보내기 공용)"""
+    fields = []
+    if "capital_impairment" in matched_conditions:
+        fields.append(("자본상태", "자본잠식" if company.get("is_capital_impaired") else "자본잠식 아님"))
+    if "ceo_gender" in matched_conditions:
+        fields.append(("대표 성별", {"F": "여성", "M": "남성"}.get(company.get("ceo_gender"), "-")))
+    if "has_exit" in matched_conditions:
+        fields.append(("엑싯", "O" if company.get("has_exit") else "X"))
+    if "sourcing_channel" in matched_conditions:
+        fields.append(("발굴채널", company.get("sourcing_channel", "-")))
+    return fields
+
+
+def available_formats() -> list:
+    """설치된 패키지로 만들 수 있는 형식 (XLSX는 openpyxl 필요)"""
+    return [fmt for fmt in FORMATS if fmt != "XLSX" or Workbook is not None]
+
+
+def iter_rows(pages, matched_conditions: dict):
+    """페이지(기업 목록) 이터레이터 → 헤더 + 행 목록 순으로 반환"""
+    dynamic = [label for label, _ in dynamic_fields({}, matched_conditions)]
+    yield [label for label, _ in BASE_COLUMNS] + dynamic
+    for page in pages:
+        for company in page:
+            yield (
+                [company.get(field) for _, field in BASE_COLUMNS]
+                + [value for _, value in dynamic_fields(company, matched_conditions)]
+            )
+
+
+def write_csv(rows, path: str) -> int:
+    """행을 CSV로 기록 (엑셀에서 한글이 깨지지 않도록 BOM 포함). 반환: 데이터 행 수"""
+    count = -1
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        for count, row in enumerate(rows):
+            writer.writerow(row)
+    return max(count, 0)
+
+
+def write_xlsx(rows, path: str) -> int:
+    """행을 XLSX로 기록 (write_only 모드라 행을 메모리에 쌓지 않음). 반환: 데이터 행 수"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("검색 결과")
+    count = -1
+    for count, row in enumerate(rows):
+        sheet.append(row)
+    workbook.save(path)
+    return max(count, 0)
+
+
+def export_to_file(pages, matched_conditions: dict, fmt: str) -> tuple[str, int]:
+    """임시 파일로 내보내기. 반환: (파일 경로, 데이터 행 수), 파일 삭제는 호출자 책임"""
+    suffix, _ = FORMATS[fmt]
+    fd, path = tempfile.mkstemp(prefix="lattice_export_", suffix=suffix)
+    os.close(fd)
+    writer = write_xlsx if fmt == "XLSX" else write_csv
+    try:
+        return path, writer(iter_rows(pages, matched_conditions), path)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class ExportJob:
+    """백그라운드 내보내기 1건. 진행 행 수 / 결과 파일 / 오류를 다른 스레드에서 읽을 수 있다
+
+    discard()하면 실행 중이어도 다음 페이지 전에 멈추고 파일을 지운다. 세션이 버려져
+    작업 객체가 회수될 때도 임시 파일을 지운다.
+    """
+
+    def __init__(self, fmt: str, max_rows: int | None = DEFAULT_MAX_ROWS):
+        self.fmt = fmt
+        self.max_rows = max_rows
+        self.rows = 0
+        self.truncated = False
+        self.path = None
+        self.error = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._cleanup = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self, pages, matched_conditions: dict):
+        """파일 기록 (페이지 조회 중 오류도 error에 남김). 취소됐으면 기록한 파일은 삭제"""
+        try:
+            path, _ = export_to_file(self._limit(pages), matched_conditions, self.fmt)
+            with self._lock:
+                if self._cancelled:
+                    _remove(path)
+                else:
+                    self.path = path
+                    self._cleanup = weakref.finalize(self, _remove, path)
+        except Exception as e:
+            self.error = str(e) or type(e).__name__
+        finally:
+            self._done.set()
+
+    def _limit(self, pages):
+        """행 수를 세고 max_rows를 넘는 부분은 잘라냄. 취소되면 다음 페이지를 받지 않음"""
+        for page in pages:
+            if self._cancelled:
+                return
+            if self.max_rows is not None and self.rows + len(page) > self.max_rows:
+                page = page[:self.max_rows - self.rows]
+                self.truncated = True
+            self.rows += len(page)
+            yield page
+            if self.truncated:
+                return
+
+    def discard(self):
+        """작업 취소 + 임시 파일 삭제"""
+        with self._lock:
+            self._cancelled = True
+            cleanup, self._cleanup, self.path = self._cleanup, None, None
+        if cleanup is not None:
+            cleanup()
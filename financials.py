@@ -0,0 +1,117 @@
+"""기업 × 기간 재무제표 비교 (필드별 2차원 배열 + 벡터 연산 비율)"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+QUARTER_ORDER = {"Q1": 1, "Q2": 2, "Q3": 3, "Q4": 4}
+
+# 파생 비율 (라벨, 키). 값은 비율(0.15 = 15%)
+RATIOS = [
+    ("매출총이익률", "gross_margin"),
+    ("영업이익률", "operating_margin"),
+    ("순이익률", "net_margin"),
+    ("부채비율", "debt_ratio"),
+    ("자본잠식률", "impairment_ratio"),
+    ("매출 성장률(YoY)", "revenue_yoy"),
+]
+
+
+def period_key(period: dict) -> tuple:
+    """정렬 가능한 기간 키 (연도, 분기 번호). 분기 표기가 없으면 연간(0)"""
+    return int(period.get("year") or 0), QUARTER_ORDER.get(str(period.get("quarter", "")).upper(), 0)
+
+
+def period_label(key: tuple) -> str:
+    year, quarter = key
+    return f"{year}" if not quarter else f"{year} Q{quarter}"
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """0이나 NaN으로 나누는 칸은 NaN"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = numerator / denominator
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+class FinancialPanel:
+    """재무제표 응답 여러 건을 필드별 [기업, 기간] 배열로 모은 표 (생성 후 읽기 전용)
+
+    같은 기업·기간 응답이 여러 번 오면 나중 것을 사용. 없는 칸은 NaN.
+    """
+
+    def __init__(self, payloads: list, fields: list):
+        self.companies = list(dict.fromkeys(p.get("company", {}).get("name", "") for p in payloads))
+        self.periods = sorted({period_key(p.get("period", {})) for p in payloads})
+        self.fields = list(fields)
+
+        row = {name: i for i, name in enumerate(self.companies)}
+        col = {key: j for j, key in enumerate(self.periods)}
+        self.values = {field: np.full((len(self.companies), len(self.periods)), np.nan) for field in self.fields}
+        for payload in payloads:
+            i = row[payload.get("company", {}).get("name", "")]
+            j = col[period_key(payload.get("period", {}))]
+            statement = {**payload.get("summary", {}), **payload.get("full", {})}
+            for field in self.fields:
+                value = statement.get(field)
+                if value is not None:
+                    self.values[field][i, j] = value
+
+        self._ratios = None
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.companies), len(self.periods)
+
+    def field(self, name: str) -> np.ndarray:
+        """필드 배열 (패널에 없는 필드는 전부 NaN)"""
+        if name in self.values:
+            return self.values[name]
+        return np.full(self.shape, np.nan)
+
+    def ratios(self) -> dict:
+        """파생 비율 {키: [기업, 기간] 배열} (처음 호출 시 한 번 계산)"""
+        if self._ratios is None:
+            f = self.field
+            revenue = f("revenue")
+            capital = f("capital")
+            prior = self._prior_year_index()
+            self._ratios = {
+                "gross_margin": _ratio(f("gross_profit"), revenue),
+                "operating_margin": _ratio(f("operating_profit"), revenue),
+                "net_margin": _ratio(f("net_income"), revenue),
+                "debt_ratio": _ratio(f("total_liabilities"), f("total_equity")),
+                # 자본금 대비 잠식된 비율 (자본총계가 자본금 이상이면 0)
+                "impairment_ratio": np.clip(_ratio(capital - f("total_equity"), capital), 0, None),
+                "revenue_yoy": _ratio(revenue, revenue[:, prior]) - 1,
+            }
+            # 전년 동기 기간이 없는 칸
+            self._ratios["revenue_yoy"][:, prior < 0] = np.nan
+        return self._ratios
+
+    def latest_index(self) -> np.ndarray:
+        """기업별 값이 하나라도 있는 가장 최근 기간의 열 번호"""
+        present = np.zeros(self.shape, dtype=bool)
+        for values in self.values.values():
+            present |= ~np.isnan(values)
+        return self.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+
+    def _prior_year_index(self) -> np.ndarray:
+        """기간별 전년 동기 열 번호 (없으면 -1)"""
+        col = {key: j for j, key in enumerate(self.periods)}
+        return np.array([col.get((year - 1, quarter), -1) for year, quarter in self.periods], dtype=int)
+
+
+@lru_cache(maxsize=4096)
+def format_ratio(value: float) -> str:
+    if math.isnan(value):
+        return "-"
+    return f"{value * 100:,.1f}%"
+
+
+def format_grid(values: np.ndarray, formatter) -> list:
+    """2차원 배열 → 문자열 행 목록. 고유값마다 한 번만 포맷"""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    labels = np.array([formatter(float(v)) for v in uniques], dtype=object)
+    return labels[inverse.reshape(values.shape)].tolist()
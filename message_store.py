@@ -0,0 +1,114 @@
+"""원본 응답(raw payload) 디스크 저장소 (sqlite, 세션별 용량 제한)"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), "lattice_payloads.sqlite3")
+
+# 세션별 압축 후 용량 상한 (넘으면 오래된 것부터 삭제)
+DEFAULT_SESSION_CAP_BYTES = 20 * 1024 * 1024
+
+# 이 시간 이상 지난 원본은 세션과 무관하게 삭제 (끊긴 세션 정리용)
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# put() 중 만료 원본을 정리하는 최소 간격(초). 장시간 떠 있는 프로세스에서도 파일이 계속 커지지 않게 함
+DEFAULT_PURGE_INTERVAL = 10 * 60
+
+
+class PayloadStore:
+    """(세션, 메시지) → 원본 JSON. 프로세스 내 여러 세션이 공유, 스레드 안전."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        session_cap_bytes: int = DEFAULT_SESSION_CAP_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+        purge_interval: float = DEFAULT_PURGE_INTERVAL,
+    ):
+        self.session_cap_bytes = session_cap_bytes
+        self.max_age = max_age
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS payloads (
+                session_id TEXT NOT NULL,
+                msg_id TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                body BLOB NOT NULL,
+                PRIMARY KEY (session_id, msg_id)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS payloads_created ON payloads (created)")
+        self.evictions = 0
+        self.purge_expired()
+
+    def put(self, session_id: str, msg_id: str, data: dict):
+        """원본 저장 후 세션 용량 상한을 넘으면 오래된 것부터 삭제 (만료 원본도 purge_interval마다 정리)"""
+        body = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO payloads VALUES (?, ?, ?, ?, ?)",
+                (session_id, msg_id, len(body), now, body),
+            )
+            self._evict(session_id)
+            if now - self._last_purge >= self.purge_interval:
+                self._purge_expired(now)
+
+    def get(self, session_id: str, msg_id: str) -> dict | None:
+        """원본 조회. 삭제(퇴출)됐으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM payloads WHERE session_id = ? AND msg_id = ?",
+                (session_id, msg_id),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def drop_session(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM payloads WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self):
+        with self._lock:
+            self._purge_expired(time.time())
+
+    def _purge_expired(self, now: float):
+        """max_age가 지난 원본 삭제 (잠금 안에서 호출)"""
+        self._conn.execute("DELETE FROM payloads WHERE created < ?", (now - self.max_age,))
+        self._last_purge = now
+
+    def usage(self, session_id: str) -> dict:
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM payloads WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return {"count": count, "bytes": size, "cap_bytes": self.session_cap_bytes}
+
+    def _evict(self, session_id: str):
+        rows = self._conn.execute(
+            "SELECT msg_id, size FROM payloads WHERE session_id = ? ORDER BY created DESC",
+            (session_id,),
+        ).fetchall()
+        total = 0
+        for i, (msg_id, size) in enumerate(rows):
+            total += size
+            # 가장 최근 원본 1건은 상한을 넘어도 유지
+            if i > 0 and total > self.session_cap_bytes:
+                self._conn.execute(
+                    "DELETE FROM payloads WHERE session_id = ? AND msg_id = ?",
+                    (session_id, msg_id),
+                )
+                self.evictions += 1
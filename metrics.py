@@ -0,0 +1,110 @@
+"""턴 단위 단계별 지연 계측 및 내보내기 (Prometheus 텍스트 + JSONL 로그)"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# 계측 단계 (표시 순서)
+PHASES = ("connect", "server", "ttfb", "transfer", "decode", "summary", "render", "total")
+
+# 히스토그램 버킷 상한 (ms)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+DEFAULT_METRICS_DIR = os.path.join(tempfile.gettempdir(), "lattice_metrics")
+
+METRIC_NAME = "lattice_turn_phase_ms"
+
+
+class TurnTimer:
+    """한 턴의 단계별 소요 시간(ms) 기록"""
+
+    def __init__(self):
+        self.phases = {}
+
+    def add(self, phase: str, ms: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + ms
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+
+class MetricsRegistry:
+    """(단계, route_type, workspace) 라벨별 히스토그램. 스레드 안전.
+
+    기록할 때마다 JSONL 파일에 한 줄 추가하고, Prometheus textfile 형식 파일을 갱신한다.
+    """
+
+    def __init__(self, directory: str | None = DEFAULT_METRICS_DIR):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (단계, route_type, workspace) -> [버킷별 건수, 합계, 건수]
+        self.log_path = self.prom_path = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.log_path = os.path.join(directory, "turns.jsonl")
+            self.prom_path = os.path.join(directory, "lattice.prom")
+
+    def record_turn(self, workspace: str, route_type: str, phases: dict, **fields):
+        """턴 1건의 단계별 시간 기록"""
+        with self._lock:
+            for phase, ms in phases.items():
+                hist = self._histograms.setdefault(
+                    (phase, route_type, workspace), [[0] * len(BUCKETS_MS), 0.0, 0]
+                )
+                for i, bound in enumerate(BUCKETS_MS):
+                    if ms <= bound:
+                        hist[0][i] += 1
+                hist[1] += ms
+                hist[2] += 1
+
+            if self.log_path:
+                line = {"ts": time.time(), "workspace": workspace, "route_type": route_type, "phases": phases, **fields}
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(line, ensure_ascii=False) + "\n")
+            if self.prom_path:
+                self._write_prometheus()
+
+    def summary(self) -> dict:
+        """단계별 건수 / 평균(ms), 모든 라벨 합산"""
+        totals = {}
+        with self._lock:
+            for (phase, _, _), (_, total, count) in self._histograms.items():
+                agg = totals.setdefault(phase, [0.0, 0])
+                agg[0] += total
+                agg[1] += count
+        return {
+            phase: {"count": totals[phase][1], "mean_ms": totals[phase][0] / totals[phase][1]}
+            for phase in PHASES
+            if phase in totals
+        }
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            return self._render_prometheus()
+
+    def _render_prometheus(self) -> str:
+        lines = [
+            f"# HELP {METRIC_NAME} Lattice chat turn latency by phase in milliseconds",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for (phase, route_type, workspace), (buckets, total, count) in sorted(self._histograms.items()):
+            labels = f'phase="{phase}",route_type="{route_type}",workspace="{workspace}"'
+            for bound, n in zip(BUCKETS_MS, buckets):
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {n}')
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {total:.3f}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def _write_prometheus(self):
+        # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        tmp_path = self.prom_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self._render_prometheus())
+        os.replace(tmp_path, self.prom_path)
@@ -0,0 +1,159 @@
+"""워크스페이스별 기업명 접두어 인덱스 (자동 완성 + 이름 조회를 로컬에서 처리)"""
+import bisect
+import threading
+import time
+
+# 스냅샷 레코드를 로컬 응답에 쓸 수 있는 기간(초)
+DEFAULT_SNAPSHOT_TTL = 60 * 60
+
+# 스냅샷 조회 실패 후 다시 시도하기까지 대기(초)
+SNAPSHOT_RETRY_INTERVAL = 60
+
+# 검색 결과에서 얻은 레코드를 로컬 응답에 쓸 수 있는 기간(초), 결과 캐시 스타트업 TTL과 같음
+DEFAULT_RECORD_TTL = 300
+
+
+def normalize_name(name: str) -> str:
+    """이름 비교용 정규화 (공백 제거 + 대소문자 무시)"""
+    return "".join(name.split()).casefold()
+
+
+class NameIndex:
+    """정렬된 정규화 이름 배열 + 이름별 레코드. 스레드 안전.
+
+    레코드가 없거나(추천 검색어로만 알게 된 이름) 오래된 항목은 자동 완성에만 쓰인다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []  # 정규화 이름 (정렬)
+        self._entries = {}  # 정규화 이름 -> {"name", "record", "expires"}
+        self.version = None
+        self.refreshed = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load(self, companies: list, version: str | None = None, ttl: float = DEFAULT_SNAPSHOT_TTL):
+        """스냅샷으로 전체 교체"""
+        expires = time.time() + ttl
+        entries = {}
+        for company in companies:
+            if company.get("name"):
+                entries[normalize_name(company["name"])] = {
+                    "name": company["name"], "record": company, "expires": expires,
+                }
+        with self._lock:
+            self._entries = entries
+            self._keys = sorted(entries)
+            self.version = version
+            self.refreshed = time.time()
+
+    def add(self, name: str, record: dict | None = None, ttl: float = DEFAULT_RECORD_TTL):
+        """이름 1건 추가/갱신 (record가 없으면 기존 레코드 유지)"""
+        key = normalize_name(name)
+        if not key:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                bisect.insort(self._keys, key)
+                entry = self._entries[key] = {"name": name, "record": None, "expires": 0.0}
+            if record is not None:
+                entry.update(name=name, record=record, expires=time.time() + ttl)
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """접두어로 시작하는 이름 (정규화 순)"""
+        key = normalize_name(prefix)
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            matches = []
+            for k in self._keys[start:start + limit]:
+                if not k.startswith(key):
+                    break
+                matches.append(self._entries[k]["name"])
+        return matches
+
+    def lookup(self, name: str) -> dict | None:
+        """정확히 일치하는 이름의 항목 {"name", "record"(만료 시 None)}"""
+        with self._lock:
+            entry = self._entries.get(normalize_name(name))
+            if entry is None:
+                return None
+            fresh = entry["record"] is not None and entry["expires"] > time.time()
+            return {"name": entry["name"], "record": entry["record"] if fresh else None}
+
+
+class NameDirectory:
+    """범위(워크스페이스 / admin)별 NameIndex 모음 + 스냅샷 백그라운드 갱신"""
+
+    def __init__(self, snapshot_ttl: float = DEFAULT_SNAPSHOT_TTL):
+        self.snapshot_ttl = snapshot_ttl
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._refreshing = set()
+        self._attempted = {}  # 범위 -> 마지막 스냅샷 조회 시각
+        self.local_hits = 0
+        self.rewrites = 0
+        self.refresh_failures = 0
+
+    def index(self, scope: str) -> NameIndex:
+        with self._lock:
+            if scope not in self._indexes:
+                self._indexes[scope] = NameIndex()
+            return self._indexes[scope]
+
+    def note_response(self, scope: str, data: dict, project=None):
+        """검색 결과 기업명(+레코드)과 추천 검색어를 인덱스에 반영"""
+        if data.get("type") is not None:
+            return
+        index = self.index(scope)
+        for company in data.get("results") or []:
+            if company.get("name"):
+                index.add(company["name"], project(company) if project else company)
+        for suggestion in data.get("suggestions") or []:
+            if isinstance(suggestion, str):
+                index.add(suggestion)
+
+    def refresh(self, scope: str, loader):
+        """스냅샷이 없거나 오래됐으면 백그라운드 스레드에서 loader() → (기업 목록, 버전)으로 교체"""
+        index = self.index(scope)
+        if index.refreshed is not None and time.time() - index.refreshed < self.snapshot_ttl:
+            return
+        with self._lock:
+            if scope in self._refreshing or time.time() - self._attempted.get(scope, 0) < SNAPSHOT_RETRY_INTERVAL:
+                return
+            self._refreshing.add(scope)
+            self._attempted[scope] = time.time()
+
+        def run():
+            try:
+                companies, version = loader()
+                index.load(companies, version, ttl=self.snapshot_ttl)
+            except Exception:
+                with self._lock:
+                    self.refresh_failures += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(scope)
+
+        threading.Thread(target=run, name=f"name-snapshot-{scope}", daemon=True).start()
+
+    def note_resolution(self, local: bool):
+        """이름 조회 결과 집계 (local: 로컬 응답, 아니면 정식 이름으로 바꿔 서버 조회)"""
+        with self._lock:
+            if local:
+                self.local_hits += 1
+            else:
+                self.rewrites += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            indexes = dict(self._indexes)
+            stats = {
+                "local_hits": self.local_hits,
+                "rewrites": self.rewrites,
+                "refresh_failures": self.refresh_failures,
+            }
+        stats["names"] = {scope: len(index) for scope, index in indexes.items()}
+        return stats
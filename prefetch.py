@@ -0,0 +1,116 @@
+"""검색 상위 기업 재무제표 백그라운드 선조회 (결과 캐시에 미리 채움)"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from result_cache import normalize_query
+from search_client import CancelToken, SearchCancelled, SearchClient
+
+DEFAULT_CONCURRENCY = 2
+DEFAULT_TOP_N = 3
+
+# 아직 사용되지 않은 선조회 키를 기억하는 최대 개수
+MAX_TRACKED_KEYS = 1000
+
+
+def financial_query(company_name: str) -> str:
+    """선조회에 쓰는 재무제표 쿼리 (사용자가 입력하는 형태와 동일)"""
+    return f"{company_name} 재무제표"
+
+
+class Prefetcher:
+    """세션별 선조회 작업 관리. 동시 실행 수는 스레드 풀 크기로 제한."""
+
+    def __init__(self, client: SearchClient, concurrency: int = DEFAULT_CONCURRENCY):
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._pending = {}  # 세션 키 -> [(정규화 쿼리, future, 취소 토큰)]
+        self._running = {}  # 선조회 진행 중인 캐시 키 -> 진행 중 사용자 요청이 합류했는지
+        self._prefetched = OrderedDict()  # 선조회로 채웠고 아직 사용되지 않은 캐시 키
+        self.issued = 0
+        self.completed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.hits = 0
+
+    def schedule(self, session_key: str, workspace_id: str | None, queries: list):
+        """쿼리들을 선조회 대기열에 추가"""
+        with self._lock:
+            pending = self._pending.setdefault(session_key, [])
+            pending[:] = [entry for entry in pending if not entry[1].done()]
+            for query in queries:
+                token = CancelToken()
+                future = self._executor.submit(self._run, query, workspace_id, token)
+                pending.append((normalize_query(query), future, token))
+                self.issued += 1
+
+    def cancel(self, session_key: str, keep: str | None = None) -> int:
+        """세션의 선조회 취소 (keep과 같은 쿼리는 유지). 반환: 취소 건수
+
+        대기 중인 작업은 실행하지 않고, 실행 중인 작업은 토큰으로 HTTP 요청까지 중단한다.
+        """
+        keep = normalize_query(keep) if keep else None
+        cancelled = 0
+        with self._lock:
+            for query, future, token in self._pending.pop(session_key, []):
+                if query == keep or future.done():
+                    continue
+                if not future.cancel():
+                    token.cancel()
+                cancelled += 1
+            self.cancelled += cancelled
+        return cancelled
+
+    def note_result(self, query: str, workspace_id: str | None, result: dict):
+        """사용자 요청 결과가 선조회로 채운 캐시에서 나왔으면 적중으로 집계"""
+        if not result.get("cached") and not result.get("coalesced"):
+            return
+        key = self.client.cache_key(query, workspace_id)
+        with self._lock:
+            if key in self._running:
+                self._running[key] = True
+                self.hits += 1
+            elif key in self._prefetched:
+                del self._prefetched[key]
+                self.hits += 1
+
+    def _run(self, query: str, workspace_id: str | None, token: CancelToken):
+        key = self.client.cache_key(query, workspace_id)
+        with self._lock:
+            if self.client.cache.contains(*key) or key in self._running:
+                self.skipped += 1
+                return
+            self._running[key] = False
+
+        try:
+            self.client.search(query, workspace_id, cancel=token)
+        except SearchCancelled:
+            with self._lock:
+                del self._running[key]
+            return
+        except Exception:
+            with self._lock:
+                self.failed += 1
+                del self._running[key]
+            return
+
+        with self._lock:
+            self.completed += 1
+            if not self._running.pop(key):
+                self._prefetched[key] = True
+            while len(self._prefetched) > MAX_TRACKED_KEYS:
+                self._prefetched.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "issued": self.issued,
+                "completed": self.completed,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.completed if self.completed else 0.0,
+            }
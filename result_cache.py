@@ -0,0 +1,180 @@
+"""워크스페이스 단위 검색 결과 캐시 (TTL + LRU) 및 동시 요청 병합"""
+import threading
+import time
+from collections import OrderedDict
+
+# x-workspace-id 헤더 없이 호출하는 admin 전용 스코프
+ADMIN_SCOPE = "admin"
+
+DEFAULT_MAX_ENTRIES = 500
+
+# 응답 타입별 TTL (초)
+DEFAULT_TTLS = {
+    "startup": 300,
+    "analytics": 60,
+    "financial": 1800,
+    "web": 120,
+}
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 쿼리 정규화 (공백 정리 + 소문자)"""
+    return " ".join(query.split()).lower()
+
+
+def response_type(data: dict) -> str:
+    """응답 타입 판별 (render_response 분기와 동일)"""
+    if data.get("type") in ("analytics", "financial", "web"):
+        return data["type"]
+    return "startup"
+
+
+class ResultCache:
+    """(워크스페이스, 정규화 쿼리, 페이지) → 검색 결과. 스레드 안전."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttls: dict | None = None):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries = OrderedDict()  # key -> (만료시각, 결과)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(scope: str, query: str, offset: int = 0, limit: int | None = None) -> tuple:
+        return (scope, normalize_query(query), offset, limit)
+
+    def get(self, scope: str, query: str, offset: int = 0, limit: int | None = None) -> dict | None:
+        """캐시 조회. 만료됐거나 없으면 None"""
+        key = self.make_key(scope, query, offset, limit)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def contains(self, scope: str, query: str, offset: int = 0, limit: int | None = None) -> bool:
+        """적중/미스 집계 없이 유효한 항목이 있는지만 확인"""
+        key = self.make_key(scope, query, offset, limit)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def put(self, scope: str, query: str, result: dict, offset: int = 0, limit: int | None = None):
+        """정상 응답(200)만 저장"""
+        if result.get("status") != 200:
+            return
+        ttl = self.ttls.get(response_type(result["data"]), 0)
+        if ttl <= 0:
+            return
+
+        key = self.make_key(scope, query, offset, limit)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_workspace(self, scope: str) -> int:
+        """한 워크스페이스의 캐시 전체 삭제. 반환: 삭제 건수"""
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == scope]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class FlightAborted(Exception):
+    """선행 호출이 중단됨. 대기 중인 요청에 공유하지 않고 각자 다시 시도하게 한다"""
+
+
+class _Flight:
+    """진행 중인 업스트림 호출 1건"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.aborted = False
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 요청을 한 번의 업스트림 호출로 병합"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, abort=None) -> tuple:
+        """fn()을 키당 한 번만 실행하고 결과/예외를 공유. 반환: (결과, 병합여부)
+
+        abort: 대기 중 주기적으로 호출, 예외를 던지면 대기를 포기한다
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            while not flight.done.wait(0.1):
+                if abort is not None:
+                    abort()
+            if flight.aborted:
+                # 선행 호출이 중단됨 (취소, 스크립트 재실행 등) → 직접 다시 시도
+                return self.do(key, fn, abort)
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except FlightAborted:
+            flight.aborted = True
+            raise
+        except Exception as e:
+            flight.error = e
+            raise
+        except BaseException:
+            flight.aborted = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+            }
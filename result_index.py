@@ -0,0 +1,86 @@
+"""검색 결과 로컬 필터/정렬 인덱스 (재검색 없이 결과 내 조건 적용)"""
+import bisect
+
+# 값 → 행 번호 집합 인덱스를 만드는 필드
+CATEGORY_FIELDS = ("industry", "region", "round", "stage", "ceo_gender", "sourcing_channel")
+FLAG_FIELDS = ("is_capital_impaired", "has_exit")
+
+# 정렬 기준 → 정렬 키
+SORT_KEYS = {
+    "pre_money_valuation": lambda c: c.get("pre_money_valuation"),
+    "name": lambda c: c.get("name") or "",
+    "investment_date": lambda c: c.get("investment_date") or "",
+}
+
+
+class ResultIndex:
+    """결과 목록 1건에 대한 필드별 역인덱스 + 정렬 순서 (생성 후 읽기 전용)"""
+
+    def __init__(self, results: list):
+        self.results = results
+        self.postings = {field: {} for field in CATEGORY_FIELDS + FLAG_FIELDS}
+        for i, company in enumerate(results):
+            for field in CATEGORY_FIELDS:
+                value = company.get(field)
+                if value not in (None, ""):
+                    self.postings[field].setdefault(value, set()).add(i)
+            for field in FLAG_FIELDS:
+                self.postings[field].setdefault(bool(company.get(field)), set()).add(i)
+
+        # 정렬 기준별 행 번호 순서 (값 없는 행은 항상 뒤)
+        self.orders = {}
+        for field, sort_key in SORT_KEYS.items():
+            present = [i for i, c in enumerate(results) if sort_key(c) not in (None, "")]
+            missing = [i for i, c in enumerate(results) if sort_key(c) in (None, "")]
+            self.orders[field] = (sorted(present, key=lambda i: sort_key(results[i])), missing)
+
+        # 밸류에이션 범위 검색용 정렬 배열
+        ordered, _ = self.orders["pre_money_valuation"]
+        self._valuations = [results[i]["pre_money_valuation"] for i in ordered]
+
+    def values(self, field: str) -> list:
+        """필드의 고유값 (건수 많은 순)"""
+        postings = self.postings[field]
+        return sorted(postings, key=lambda v: (-len(postings[v]), str(v)))
+
+    def valuation_bounds(self) -> tuple | None:
+        if not self._valuations:
+            return None
+        return self._valuations[0], self._valuations[-1]
+
+    def query(
+        self,
+        filters: dict | None = None,
+        valuation_range: tuple | None = None,
+        sort_by: str | None = None,
+        descending: bool = False,
+    ) -> list:
+        """조건에 맞는 기업 목록
+
+        filters: {필드: 허용값 집합} (같은 필드는 OR, 필드 간 AND)
+        valuation_range: (최소, 최대) Pre-money, 양끝 포함
+        """
+        matched = None
+        for field, values in (filters or {}).items():
+            if not values:
+                continue
+            postings = self.postings[field]
+            ids = set().union(*(postings.get(v, set()) for v in values))
+            matched = ids if matched is None else matched & ids
+
+        if valuation_range is not None:
+            ordered, _ = self.orders["pre_money_valuation"]
+            lo = bisect.bisect_left(self._valuations, valuation_range[0])
+            hi = bisect.bisect_right(self._valuations, valuation_range[1])
+            ids = set(ordered[lo:hi])
+            matched = ids if matched is None else matched & ids
+
+        if sort_by is None:
+            ids = range(len(self.results)) if matched is None else sorted(matched)
+        else:
+            present, missing = self.orders[sort_by]
+            if descending:
+                present = reversed(present)
+            ids = [i for i in (*present, *missing) if matched is None or i in matched]
+
+        return [self.results[i] for i in ids]
@@ -0,0 +1,584 @@
+"""Lattice 검색 API HTTP 클라이언트 (커넥션 풀 · keep-alive · 재시도 · 스트리밍 · 취소/적응형 타임아웃)"""
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from result_cache import ADMIN_SCOPE, FlightAborted, ResultCache, SingleFlight, response_type
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# 기본값 (secrets로 덮어쓰기 가능)
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF = 0.3
+DEFAULT_TIMEOUT = 30
+DEFAULT_PAGE_SIZE = 20
+
+# 경로 타입별 기본 limit. 없는 경로(재무제표/웹)는 offset/limit 없이 전체 응답을 받음
+DEFAULT_PAGE_SIZES = {"startup": DEFAULT_PAGE_SIZE, "analytics": 100}
+CONNECT_TIMEOUT = 5
+
+# 적응형 타임아웃: 경로 타입별 최근 응답 시간 p99 × 배수, [최소, 최대]로 제한
+MIN_TIMEOUT = 5
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+TIMEOUT_MULTIPLIER = 3
+
+# 취소/마감 확인 주기 (초)
+POLL_INTERVAL = 0.1
+
+# 게이트웨이/콜드스타트 계열 상태코드만 재시도
+RETRY_STATUSES = (502, 503, 504)
+
+# 스트리밍 응답 우선, 미지원 서버는 기존 JSON 그대로
+ACCEPT_HEADER = "application/x-ndjson, text/event-stream;q=0.9, application/json;q=0.8"
+STREAM_CONTENT_TYPES = ("application/x-ndjson", "text/event-stream")
+
+# orjson이 있으면 사용 (표준 json보다 큰 응답 디코딩이 수 배 빠름)
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> requests.Session:
+    """keep-alive 커넥션 풀을 가진 세션 생성
+
+    pool_block=True: 여러 실행 풀(검색/비교/선조회/내보내기)이 세션을 같이 쓰므로, 풀 크기를 넘는
+    동시 요청은 일회용 커넥션을 새로 열지 않고 반납된 커넥션을 기다려 재사용한다.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        # 요청이 서버에 도달했을 수 있는 읽기 오류는 재시도하지 않음
+        read=0,
+        status=max_retries,
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=backoff,
+        # 검색은 조회 전용(멱등)이라 POST도 재시도 허용
+        allowed_methods=frozenset(["POST"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_server_timing(header: str) -> float | None:
+    """Server-Timing 헤더의 서버 처리 시간(ms). "total" 항목 우선, 없으면 합계"""
+    durations = {}
+    for entry in header.split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur":
+                try:
+                    durations[name.strip()] = float(value)
+                except ValueError:
+                    pass
+    if not durations:
+        return None
+    return durations.get("total", sum(durations.values()))
+
+
+def _decode(text):
+    """JSON 디코딩. 실패는 response.json()과 같은 requests.JSONDecodeError(RequestException)로 올림
+
+    게이트웨이 HTML 오류 페이지 같은 비JSON 본문도 호출자의 RequestException 처리(재시도/오류 표시)로 가게 함
+    """
+    try:
+        return _loads(text)
+    except ValueError as e:
+        doc = text.decode("utf-8", "replace") if isinstance(text, (bytes, bytearray)) else text
+        raise requests.JSONDecodeError(getattr(e, "msg", str(e)), doc, getattr(e, "pos", 0)) from e
+
+
+def decode_json(text, timings: dict | None = None):
+    """JSON 디코딩 (timings가 있으면 소요 시간을 decode_ms에 누적)"""
+    if timings is None:
+        return _decode(text)
+    started = time.perf_counter()
+    try:
+        return _decode(text)
+    finally:
+        timings["decode_ms"] = timings.get("decode_ms", 0.0) + (time.perf_counter() - started) * 1000
+
+
+def iter_stream_events(response: requests.Response, timings: dict | None = None, sizes: dict | None = None):
+    """NDJSON/SSE 응답을 (이벤트명, 데이터) 순으로 반환
+
+    NDJSON: 한 줄당 {"event": ..., "data": ...}
+    SSE: "event: <이벤트명>" + "data: <JSON>" 블록
+    sizes가 있으면 압축 해제 후 본문 바이트를 body에 누적
+    """
+    is_sse = response.headers.get("Content-Type", "").startswith("text/event-stream")
+    event_name, data_lines = "message", []
+
+    for raw in response.iter_lines(chunk_size=512):
+        if sizes is not None:
+            sizes["body"] = sizes.get("body", 0) + len(raw) + 1
+        line = raw.decode("utf-8")
+        if not is_sse:
+            if line.strip():
+                message = decode_json(line, timings)
+                yield message.get("event", "message"), message.get("data")
+            continue
+
+        # SSE: 빈 줄에서 이벤트 1건 완료
+        if not line:
+            if data_lines:
+                yield event_name, decode_json("\n".join(data_lines), timings)
+            event_name, data_lines = "message", []
+        elif line.startswith("event:"):
+            event_name = line[6:].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+
+    if is_sse and data_lines:
+        yield event_name, decode_json("\n".join(data_lines), timings)
+
+
+def apply_stream_event(data: dict, event: str, value):
+    """스트림 이벤트를 일반 JSON 응답과 같은 모양으로 누적"""
+    if event == "meta":
+        data["meta"] = value
+    elif event == "result":
+        data.setdefault("results", []).append(value)
+    elif event == "suggestions":
+        data["suggestions"] = value
+    elif event in ("payload", "error", "message") and isinstance(value, dict):
+        # 통계/재무/웹 등 한 번에 오는 응답, 에러 본문
+        data.update(value)
+
+
+class SearchCancelled(FlightAborted):
+    """새 요청으로 대체되어 취소된 검색"""
+
+
+class CancelToken:
+    """요청 1건의 취소 신호. cancel() 시 연결된 HTTP 응답도 닫아 읽기를 중단시킨다"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._responses = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            responses, self._responses = self._responses, []
+        for response in responses:
+            response.close()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise SearchCancelled()
+
+    def attach(self, response: requests.Response):
+        """응답을 취소 대상으로 등록 (이미 취소됐으면 바로 닫고 SearchCancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._responses.append(response)
+                return
+        response.close()
+        raise SearchCancelled()
+
+
+def guess_route_type(query: str) -> str:
+    """응답 전 타임아웃 선택용 경로 타입 추정 (안내 문구의 예시 기준)"""
+    if any(k in query for k in ("재무제표", "실적", "매출", "영업이익")):
+        return "financial"
+    if any(k in query for k in ("몇 개", "몇개", "분포", "통계", "비율")):
+        return "analytics"
+    if any(k in query for k in ("뉴스", "주가", "최신")):
+        return "web"
+    return "startup"
+
+
+class LatencyTracker:
+    """경로 타입별 최근 응답 시간 → 적응형 타임아웃 / 헤지 지연"""
+
+    def __init__(
+        self,
+        max_timeout: float = DEFAULT_TIMEOUT,
+        min_timeout: float = MIN_TIMEOUT,
+        window: int = LATENCY_WINDOW,
+    ):
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(route, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, route: str, p: float) -> float | None:
+        """최근 응답 시간의 p 분위수 (표본 부족 시 None)"""
+        with self._lock:
+            samples = sorted(self._samples.get(route, ()))
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+    def timeout(self, route: str) -> float:
+        p99 = self.percentile(route, 99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * TIMEOUT_MULTIPLIER))
+
+    def hedge_delay(self, route: str) -> float | None:
+        """이 시간 안에 응답 시작이 없으면 헤지 요청 (p95, 표본 부족 시 헤지 안 함)"""
+        return self.percentile(route, 95)
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = list(self._samples)
+        return {
+            route: {
+                "samples": len(self._samples[route]),
+                "p50": self.percentile(route, 50),
+                "p95": self.percentile(route, 95),
+                "p99": self.percentile(route, 99),
+                "timeout": self.timeout(route),
+            }
+            for route in routes
+        }
+
+
+def post_search(
+    session: requests.Session,
+    url: str,
+    headers: dict,
+    payload: dict,
+    timeout: float | tuple = DEFAULT_TIMEOUT,
+    on_event=None,
+    cancel: CancelToken | None = None,
+) -> dict:
+    """검색 요청 전송. 반환: {"data", "status", "elapsed_ms", "ttfb_ms", "timings", "bytes"}
+
+    서버가 NDJSON/SSE로 응답하면 이벤트가 도착할 때마다 on_event(이벤트명, 데이터)를
+    호출하고, 최종 반환값은 일반 JSON 응답과 동일한 형태로 조립한다.
+    cancel이 취소되면 응답 연결을 닫고 SearchCancelled를 던진다.
+
+    timings: 단계별 시간(ms). ttfb = 연결 + 서버 처리, Server-Timing 헤더가 있으면
+    server / connect(= ttfb - server)로 나누고, 본문은 transfer / decode로 나눈다.
+    bytes: {"wire": 전송 바이트(압축 상태, 알 수 없으면 None), "body": 압축 해제 후 바이트}
+    """
+    started = time.perf_counter()
+    # 압축은 urllib3가 풀 수 있는 방식만 협상 (gzip/deflate, brotli·zstandard 패키지가 있으면 br·zstd 포함)
+    response = session.post(
+        url,
+        headers={**headers, "Accept": ACCEPT_HEADER, "Accept-Encoding": ACCEPT_ENCODING},
+        json=payload,
+        timeout=timeout,
+        stream=True,
+    )
+    if cancel is not None:
+        cancel.attach(response)
+
+    ttfb_ms = response.elapsed.total_seconds() * 1000
+    timings = {"ttfb_ms": ttfb_ms, "decode_ms": 0.0}
+    server_ms = parse_server_timing(response.headers.get("Server-Timing", ""))
+    if server_ms is not None:
+        timings["server_ms"] = server_ms
+        timings["connect_ms"] = max(0.0, ttfb_ms - server_ms)
+
+    body_started = time.perf_counter()
+    callback_ms = 0.0
+    sizes = {}
+    with response:
+        content_type = response.headers.get("Content-Type", "")
+        if content_type.startswith(STREAM_CONTENT_TYPES):
+            data = {}
+            for event, value in iter_stream_events(response, timings, sizes):
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                if event == "done":
+                    continue
+                apply_stream_event(data, event, value)
+                if on_event is not None:
+                    callback_started = time.perf_counter()
+                    on_event(event, value)
+                    callback_ms += (time.perf_counter() - callback_started) * 1000
+        else:
+            content = response.content
+            sizes["body"] = len(content)
+            data = decode_json(content, timings)
+        wire = response.raw.tell()
+        if not wire and not response.headers.get("Content-Encoding"):
+            # 청크 스트리밍은 urllib3가 읽은 바이트를 세지 않으므로 비압축이면 본문 크기로 대신
+            wire = sizes.get("body")
+        sizes["wire"] = wire or None
+    finished = time.perf_counter()
+    timings["transfer_ms"] = max(0.0, (finished - body_started) * 1000 - timings["decode_ms"] - callback_ms)
+
+    return {
+        "data": data,
+        "status": response.status_code,
+        "elapsed_ms": (finished - started) * 1000,
+        # 헤더 수신까지 걸린 시간 (연결 + 서버 처리)
+        "ttfb_ms": ttfb_ms,
+        "timings": timings,
+        "bytes": sizes,
+    }
+
+
+class SearchClient:
+    """워크스페이스별 캐시 → 동시 요청 병합 → HTTP 순으로 검색
+
+    Streamlit 세션 상태에 의존하지 않으므로 백그라운드 스레드에서도 사용 가능.
+    HTTP 요청은 내부 스레드 풀에서 실행하고, 호출 스레드는 이벤트를 받아 전달하면서
+    취소 신호와 적응형 마감 시간을 확인한다. hedge=True면 느린 꼬리 구간에서
+    같은 요청을 한 번 더 보내 먼저 응답하는 쪽을 쓴다.
+    max_workers는 세션 커넥션 풀 크기와 맞춘다 (더 크면 초과분은 커넥션을 기다림).
+    fields가 있으면 요청 payload에 렌더러가 읽는 필드 목록으로 실어 보내 응답을 줄인다
+    (지원하지 않는 서버는 무시하고 전체 필드로 응답).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        session: requests.Session,
+        cache: ResultCache,
+        flights: SingleFlight,
+        page_sizes: dict | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        hedge: bool = False,
+        max_workers: int = DEFAULT_POOL_SIZE,
+        fields: dict | None = None,
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.session = session
+        self.cache = cache
+        self.flights = flights
+        self.page_sizes = DEFAULT_PAGE_SIZES if page_sizes is None else page_sizes
+        self.hedge = hedge
+        self.fields = fields
+        self.latency = LatencyTracker(max_timeout=timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @staticmethod
+    def scope(workspace_id: str | None) -> str:
+        """캐시 스코프: x-workspace-id 헤더와 동일 기준, 헤더가 없으면 admin"""
+        return workspace_id or ADMIN_SCOPE
+
+    def default_limit(self, query: str) -> int | None:
+        """limit을 주지 않은 요청의 페이지 크기 (추정 경로 타입 기준, None이면 전체)"""
+        return self.page_sizes.get(guess_route_type(query))
+
+    def cache_key(self, query: str, workspace_id: str | None, offset: int = 0, limit: int | None = None) -> tuple:
+        return self.cache.make_key(self.scope(workspace_id), query, offset, limit or self.default_limit(query))
+
+    def headers(self, workspace_id: str | None) -> dict:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        if workspace_id:
+            headers["x-workspace-id"] = workspace_id
+        return headers
+
+    def snapshot(self, url: str, workspace_id: str | None = None) -> dict:
+        """워크스페이스 기업 스냅샷 일괄 조회. 반환: {"version", "companies": [...]}"""
+        response = self.session.get(
+            url,
+            headers={**self.headers(workspace_id), "Accept-Encoding": ACCEPT_ENCODING},
+            timeout=(CONNECT_TIMEOUT, self.latency.max_timeout),
+        )
+        response.raise_for_status()
+        return decode_json(response.content)
+
+    def iter_pages(self, query: str, workspace_id: str | None = None, page_size: int = DEFAULT_PAGE_SIZE):
+        """전체 결과를 페이지(기업 목록) 단위로 반환. 내보내기용이라 캐시/요청 병합 없이 업스트림 직접 호출
+
+        응답 meta.next_cursor가 있으면 다음 요청에 cursor로 보내고, 없으면 offset으로 이어 받는다.
+        """
+        payload = {"query": query, "limit": page_size}
+        if self.fields:
+            payload["fields"] = self.fields
+        offset, cursor = 0, None
+        while True:
+            page = {**payload, "cursor": cursor} if cursor else {**payload, "offset": offset}
+            result = post_search(
+                self.session,
+                self.url,
+                headers=self.headers(workspace_id),
+                payload=page,
+                timeout=(CONNECT_TIMEOUT, self.latency.max_timeout),
+            )
+            data = result["data"]
+            if result["status"] != 200:
+                message = data.get("error", {}).get("message", "") if isinstance(data, dict) else ""
+                raise requests.HTTPError(f"HTTP {result['status']} {message}".strip())
+            results = data.get("results") or []
+            if results:
+                yield results
+            meta = data.get("meta", {})
+            offset += len(results)
+            cursor = meta.get("next_cursor")
+            if not results or (not cursor and offset >= meta.get("total", 0)):
+                return
+
+    def search(
+        self,
+        query: str,
+        workspace_id: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        on_event=None,
+        cancel: CancelToken | None = None,
+    ) -> dict:
+        """검색 실행. 캐시 적중 시 "cached", 병합 시 "coalesced" 플래그가 붙는다
+
+        limit을 생략하면 추정 경로 타입의 기본 페이지 크기 (재무제표/웹은 offset/limit 없이 요청).
+        """
+        limit = limit or self.default_limit(query)
+        scope = self.scope(workspace_id)
+
+        cached = self.cache.get(scope, query, offset, limit)
+        if cached is not None:
+            return {**cached, "cached": True, "elapsed_ms": 0.0, "ttfb_ms": 0.0, "timings": {}, "bytes": {}}
+
+        payload = {"query": query}
+        if limit is not None:
+            payload.update(offset=offset, limit=limit)
+        if self.fields:
+            payload["fields"] = self.fields
+
+        def fetch() -> dict:
+            result = self._fetch(
+                query,
+                headers=self.headers(workspace_id),
+                payload=payload,
+                on_event=on_event,
+                cancel=cancel,
+            )
+            self.cache.put(scope, query, result, offset, limit)
+            return result
+
+        # 같은 워크스페이스의 동일 쿼리가 진행 중이면 그 결과를 함께 사용
+        abort = cancel.raise_if_cancelled if cancel is not None else None
+        result, coalesced = self.flights.do(self.cache.make_key(scope, query, offset, limit), fetch, abort)
+        if coalesced:
+            return {**result, "coalesced": True}
+        return result
+
+    def _attempt(self, events: queue.Queue, attempt: int, token: CancelToken, headers: dict, payload: dict, timeout: float):
+        """스레드 풀에서 HTTP 요청 1회 실행, 진행 상황은 events 큐로 전달"""
+        # 풀 대기 중에 취소/마감된 시도는 요청을 보내지 않음
+        if token.cancelled:
+            return
+        events.put((attempt, "started", time.monotonic()))
+        try:
+            result = post_search(
+                self.session,
+                self.url,
+                headers=headers,
+                payload=payload,
+                timeout=(CONNECT_TIMEOUT, timeout),
+                on_event=lambda event, value: events.put((attempt, "event", (event, value))),
+                cancel=token,
+            )
+            events.put((attempt, "result", result))
+        except Exception as e:
+            events.put((attempt, "error", e))
+
+    def _fetch(self, query: str, headers: dict, payload: dict, on_event=None, cancel: CancelToken | None = None) -> dict:
+        """업스트림 호출 (취소 · 적응형 마감 · 선택적 헤지)"""
+        route = guess_route_type(query)
+        timeout = self.latency.timeout(route)
+        hedge_delay = self.latency.hedge_delay(route) if self.hedge else None
+
+        # 마감/헤지 시간은 첫 시도가 풀에서 실제로 시작된 시각부터 (풀 대기 시간 제외)
+        started = deadline = None
+        events = queue.Queue()
+        tokens, failed = [], set()
+        winner, completed = None, False
+
+        def launch():
+            token = CancelToken()
+            tokens.append(token)
+            self._executor.submit(self._attempt, events, len(tokens) - 1, token, headers, payload, timeout)
+
+        launch()
+        try:
+            while True:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    raise requests.Timeout(f"검색 시간 초과 ({timeout:.0f}초)")
+
+                should_hedge = (
+                    hedge_delay is not None and started is not None and winner is None and len(tokens) == 1
+                )
+                wait = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, deadline - now)
+                if should_hedge:
+                    wait = max(0.0, min(wait, started + hedge_delay - now))
+                try:
+                    attempt, kind, value = events.get(timeout=wait)
+                except queue.Empty:
+                    if should_hedge and time.monotonic() - started >= hedge_delay:
+                        launch()
+                        self.hedged += 1
+                    continue
+
+                if kind == "started":
+                    if started is None:
+                        started, deadline = value, value + timeout
+                    continue
+
+                if winner is None:
+                    if kind == "error" and len(failed) + 1 < len(tokens):
+                        # 다른 시도가 아직 진행 중이면 그 결과를 기다림
+                        failed.add(attempt)
+                        continue
+                    winner = attempt
+                    if winner > 0:
+                        self.hedge_wins += 1
+                if attempt != winner:
+                    continue
+
+                if kind == "event":
+                    if on_event is not None:
+                        on_event(*value)
+                elif kind == "result":
+                    self.latency.observe(response_type(value["data"]), time.monotonic() - started)
+                    completed = True
+                    return {**value, "route_guess": route, "timeout_s": timeout, "hedged": len(tokens) > 1}
+                else:
+                    raise value
+        finally:
+            # 진 시도와 중단된 시도의 연결은 닫아서 스레드가 바로 끝나게 함
+            for i, token in enumerate(tokens):
+                if not completed or i != winner:
+                    token.cancel()
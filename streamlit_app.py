@@ -1,10 +1,52 @@
+import os
+import re
+import functools
+import itertools
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+import numpy as np
 import streamlit as st
 import requests
 
+import prefetch
+import search_client
+from analytics_table import AnalyticsTable
+from export import DEFAULT_MAX_ROWS, EXPORT_PAGE_SIZE, FORMATS, ExportJob, available_formats, dynamic_fields
+from financials import RATIOS, FinancialPanel, format_grid, format_ratio, period_label
+from message_store import PayloadStore
+from name_index import DEFAULT_SNAPSHOT_TTL, NameDirectory
+from metrics import DEFAULT_METRICS_DIR, PHASES, MetricsRegistry, TurnTimer
+from prefetch import Prefetcher, financial_query
+from result_index import ResultIndex
+from workspace_snapshot import STAGE_LABELS, SnapshotStore
+from result_cache import ADMIN_SCOPE, ResultCache, SingleFlight
+
 st.set_page_config(page_title="Lattice", page_icon="🔍", layout="wide")
 
-API_URL = st.secrets["SUPABASE_API_URL"]
-API_KEY = st.secrets["SUPABASE_ANON_KEY"]
+
+
+def get_setting(name: str, default=None):
+    """설정값 조회: 환경변수 → st.secrets → 기본값 (secrets 파일 없이도 헤드리스 실행 가능)"""
+    if name in os.environ:
+        return os.environ[name]
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:
+        return default
+
+
+API_URL = get_setting("SUPABASE_API_URL")
+API_KEY = get_setting("SUPABASE_ANON_KEY")
+
+# 워크스페이스 기업 스냅샷 URL (설정 시 기업명 인덱스/로컬 조건 검색용 사본을 주기적으로 일괄 갱신)
+SNAPSHOT_URL = get_setting("SNAPSHOT_URL")
+SNAPSHOT_TTL = float(get_setting("SNAPSHOT_TTL", DEFAULT_SNAPSHOT_TTL))
+
+# HTTP 커넥션 풀 크기 (검색 실행 풀도 같은 크기로 맞춤)
+SEARCH_POOL_SIZE = int(get_setting("SEARCH_POOL_SIZE", search_client.DEFAULT_POOL_SIZE))
 
 # 별칭 → workspace_id 매핑 (테스트용)
 WORKSPACE_ALIASES = {
@@ -22,6 +64,54 @@ WORKSPACE_PASSWORDS = {
     "bluepoint": "Bluepoint07!",
 }
 
+# 렌더링/서머리에 쓰는 기업 필드 (세션에는 이 필드만 보관)
+COMPANY_FIELDS = (
+    "name", "industry", "region", "round", "stage", "ceo_name", "ceo_gender",
+    "summary", "technologies", "pre_money_valuation", "investment_date",
+    "is_capital_impaired", "has_exit", "sourcing_channel",
+)
+
+# 결과 내 필터 필드 라벨
+REFINE_LABELS = {
+    "industry": "산업",
+    "region": "지역",
+    "round": "라운드",
+    "stage": "단계",
+    "ceo_gender": "대표 성별",
+    "sourcing_channel": "발굴채널",
+}
+
+# 결과 내 정렬 옵션: 라벨 → (정렬 기준, 내림차순)
+REFINE_SORTS = {
+    "기본": (None, False),
+    "Pre-money 높은순": ("pre_money_valuation", True),
+    "Pre-money 낮은순": ("pre_money_valuation", False),
+    "이름순": ("name", False),
+    "최근 투자순": ("investment_date", True),
+}
+
+# 스타트업 검색 결과 페이지 크기 (서버 offset/limit과 "더 보기" 단위)
+RESULT_PAGE_SIZE = 20
+
+# 통계 결과 한 화면 행 수 (서버에서 더 불러올 때도 같은 단위)
+ANALYTICS_PAGE_SIZE = 100
+
+# 내보내기 최대 행 수 / 진행 상황 갱신 주기(초)
+EXPORT_MAX_ROWS = int(get_setting("EXPORT_MAX_ROWS", DEFAULT_MAX_ROWS))
+EXPORT_POLL_INTERVAL = 1.0
+
+# 기업명 자동 완성 후보 수
+TYPEAHEAD_LIMIT = 8
+
+# 전체 렌더링할 최근 대화 턴 수 (이전 턴은 한 줄 요약으로 접힘)
+HISTORY_FULL_TURNS = 5
+
+# 비교 질문 분리 기준 ("토스 vs 카카오페이 재무제표", "핀테크 and 헬스케어 in 서울")
+FANOUT_SEPARATOR = re.compile(r"\s+(?:vs\.?|and|&)\s+", re.IGNORECASE)
+
+# 한 턴에서 동시에 보내는 최대 하위 쿼리 수
+MAX_FANOUT = 4
+
 # 세션 상태 초기화
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -30,6 +120,8 @@ if "logged_in" not in st.session_state:
     st.session_state.is_admin = False
     st.session_state.debug_mode = False
     st.session_state.messages = []
+    # 원본 응답 저장소에서 이 세션을 구분하는 키
+    st.session_state.session_key = uuid.uuid4().hex
 
 
 def login(alias: str, password: str = "") -> tuple[bool, str]:
@@ -58,6 +150,13 @@ def login(alias: str, password: str = "") -> tuple[bool, str]:
     return False, "존재하지 않는 워크스페이스입니다."
 
 
+# 메시지 번호(또는 id)별 세션 상태/위젯 키 접두어 (로그아웃 시 다음 대화로 이어지지 않도록 삭제)
+MESSAGE_STATE_PREFIXES = (
+    "shown_", "index_", "table_", "refine_", "analytics_", "more_", "expand_",
+    "export_", "fin_metric_", "raw_",
+)
+
+
 def logout():
     """로그아웃"""
     st.session_state.logged_in = False
@@ -65,24 +164,267 @@ def logout():
     st.session_state.workspace_id = None
     st.session_state.is_admin = False
     st.session_state.messages = []
+    # 실행 중인 내보내기는 취소하고 임시 파일 정리
+    for key in [k for k in st.session_state if k.startswith("export_job_")]:
+        st.session_state[key].discard()
+    for key in [k for k in st.session_state if k.startswith(MESSAGE_STATE_PREFIXES)]:
+        del st.session_state[key]
+    st.session_state.pop("financial_panel", None)
+    get_payload_store().drop_session(st.session_state.session_key)
+    get_prefetcher().cancel(st.session_state.session_key)
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """프로세스 전역 HTTP 세션 (리런/세션 간 커넥션 재사용)"""
+    return search_client.create_session(
+        pool_size=SEARCH_POOL_SIZE,
+        max_retries=int(get_setting("SEARCH_MAX_RETRIES", search_client.DEFAULT_MAX_RETRIES)),
+        backoff=float(get_setting("SEARCH_RETRY_BACKOFF", search_client.DEFAULT_BACKOFF)),
+    )
 
 
-def call_search_api(query: str) -> dict:
-    """검색 API 호출"""
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-    }
-    if not st.session_state.is_admin and st.session_state.workspace_id:
-        headers["x-workspace-id"] = st.session_state.workspace_id
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """프로세스 전역 검색 결과 캐시"""
+    return ResultCache(max_entries=int(get_setting("RESULT_CACHE_SIZE", 500)))
+
+
+@st.cache_resource
+def get_single_flight() -> SingleFlight:
+    """프로세스 전역 동시 요청 병합기"""
+    return SingleFlight()
 
-    response = requests.post(
+
+@st.cache_resource
+def get_payload_store() -> PayloadStore:
+    """프로세스 전역 원본 응답 저장소 (디버그 모드용)"""
+    cap_mb = float(get_setting("PAYLOAD_SESSION_CAP_MB", 20))
+    return PayloadStore(session_cap_bytes=int(cap_mb * 1024 * 1024))
+
+
+@st.cache_resource
+def get_search_client() -> search_client.SearchClient:
+    """프로세스 전역 검색 클라이언트 (HTTP 세션 + 결과 캐시 + 요청 병합)"""
+    return search_client.SearchClient(
         API_URL,
-        headers=headers,
-        json={"query": query},
-        timeout=30,
+        API_KEY,
+        session=get_http_session(),
+        cache=get_result_cache(),
+        flights=get_single_flight(),
+        page_sizes={"startup": RESULT_PAGE_SIZE, "analytics": ANALYTICS_PAGE_SIZE},
+        timeout=float(get_setting("SEARCH_TIMEOUT", search_client.DEFAULT_TIMEOUT)),
+        hedge=str(get_setting("SEARCH_HEDGE", False)).lower() in ("1", "true", "yes"),
+        max_workers=SEARCH_POOL_SIZE,
+        fields=WIRE_FIELDS if str(get_setting("FIELD_PROJECTION", True)).lower() in ("1", "true", "yes") else None,
+    )
+
+
+@st.cache_resource
+def get_prefetcher() -> Prefetcher:
+    """프로세스 전역 재무제표 선조회기"""
+    return Prefetcher(
+        get_search_client(),
+        concurrency=int(get_setting("PREFETCH_CONCURRENCY", prefetch.DEFAULT_CONCURRENCY)),
     )
-    return {"data": response.json(), "status": response.status_code}
+
+
+def prefetch_financials(data: dict):
+    """스타트업 검색 상위 기업의 재무제표를 백그라운드로 미리 조회 (옵트인)"""
+    if not st.session_state.get("prefetch_financials"):
+        return
+    top_n = int(get_setting("PREFETCH_TOP_N", prefetch.DEFAULT_TOP_N))
+    names = [c["name"] for c in data.get("results", [])[:top_n] if c.get("name")]
+    get_prefetcher().schedule(
+        st.session_state.session_key,
+        current_workspace_id(),
+        [financial_query(name) for name in names],
+    )
+
+
+@st.cache_resource
+def get_fanout_executor() -> ThreadPoolExecutor:
+    """프로세스 전역 비교 질문 하위 쿼리 실행 풀"""
+    return ThreadPoolExecutor(
+        max_workers=int(get_setting("FANOUT_WORKERS", 8)),
+        thread_name_prefix="fanout",
+    )
+
+
+@st.cache_resource
+def get_export_executor() -> ThreadPoolExecutor:
+    """프로세스 전역 내보내기 실행 풀 (긴 작업이 검색 풀을 막지 않도록 분리)"""
+    return ThreadPoolExecutor(
+        max_workers=int(get_setting("EXPORT_WORKERS", 2)),
+        thread_name_prefix="export",
+    )
+
+
+@st.cache_resource
+def get_name_directory() -> NameDirectory:
+    """프로세스 전역 워크스페이스별 기업명 인덱스"""
+    return NameDirectory(snapshot_ttl=SNAPSHOT_TTL)
+
+
+@st.cache_resource
+def get_snapshot_store() -> SnapshotStore:
+    """프로세스 전역 워크스페이스별 기업 스냅샷 (로컬 조건 검색)"""
+    return SnapshotStore(ttl=SNAPSHOT_TTL)
+
+
+@st.cache_resource
+def get_metrics() -> MetricsRegistry:
+    """프로세스 전역 지연 메트릭 (METRICS_DIR에 JSONL + Prometheus 파일 기록)"""
+    return MetricsRegistry(get_setting("METRICS_DIR", DEFAULT_METRICS_DIR))
+
+
+def current_workspace_id() -> str | None:
+    """x-workspace-id 헤더로 보낼 워크스페이스 (admin은 None)"""
+    if not st.session_state.is_admin and st.session_state.workspace_id:
+        return st.session_state.workspace_id
+    return None
+
+
+def call_search_api(
+    query: str,
+    on_event=None,
+    offset: int = 0,
+    limit: int | None = None,
+    cancel: search_client.CancelToken | None = None,
+) -> dict:
+    """검색 API 호출 (워크스페이스별 캐시 → 동시 요청 병합 → 업스트림, limit 생략 시 경로 타입별 기본값)"""
+    result = get_search_client().search(
+        query,
+        current_workspace_id(),
+        offset=offset,
+        limit=limit,
+        on_event=on_event,
+        cancel=cancel,
+    )
+    if result["status"] == 200:
+        get_name_directory().note_response(current_scope(), result["data"], project_company)
+    return result
+
+
+def current_scope() -> str:
+    """캐시/기업명 인덱스 범위 (workspace_id, admin은 ADMIN_SCOPE)"""
+    return get_search_client().scope(current_workspace_id())
+
+
+def refresh_snapshot():
+    """스냅샷 URL이 설정돼 있으면 현재 워크스페이스 스냅샷(기업명 인덱스 + 조건 검색 사본)을 백그라운드로 갱신"""
+    if not SNAPSHOT_URL:
+        return
+    client = get_search_client()
+    workspace_id = current_workspace_id()
+    scope = current_scope()
+
+    def load() -> tuple:
+        snapshot = client.snapshot(SNAPSHOT_URL, workspace_id)
+        companies = [project_company(c) for c in snapshot.get("companies", [])]
+        get_snapshot_store().load(scope, companies, snapshot.get("version"))
+        return companies, snapshot.get("version")
+
+    get_name_directory().refresh(scope, load)
+
+
+def search_snapshot(query: str, offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> dict | None:
+    """스냅샷 모드에서 순수 조건 질문("서울 시리즈A")을 로컬 사본으로 처리. 아니면 None (서버로)
+
+    의미 검색/웹/재무제표 질문이나 스냅샷이 없거나 오래된 경우는 서버 API를 그대로 사용한다.
+    """
+    if not (SNAPSHOT_URL and st.session_state.get("snapshot_mode")):
+        return None
+    started = time.perf_counter()
+    found = get_snapshot_store().search(current_scope(), query)
+    if found is None:
+        return None
+    snapshot, found = found
+    results = found["results"]
+    meta = {
+        "total": len(results),
+        "route_type": "local_snapshot",
+        "matched_conditions": found["matched_conditions"],
+        "snapshot_version": snapshot.version,
+        "snapshot_refreshed": snapshot.refreshed,
+    }
+    return {
+        "data": {"results": results[offset:offset + limit], "meta": meta},
+        "status": 200,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+        "ttfb_ms": 0.0,
+        "timings": {},
+        "local": True,
+    }
+
+
+def resolve_name(query: str) -> tuple:
+    """정확한 기업명 질문을 로컬에서 처리. 반환: (로컬 응답 또는 None, 서버에 보낼 쿼리)
+
+    인덱스에 유효한 레코드가 있으면 바로 응답하고, 이름만 알면 정식 이름으로 바꿔
+    서버 캐시 키를 맞춘다.
+    """
+    directory = get_name_directory()
+    entry = directory.index(current_scope()).lookup(query)
+    if entry is None:
+        return None, query
+    if entry["record"] is not None:
+        directory.note_resolution(local=True)
+        data = {
+            "results": [entry["record"]],
+            "meta": {"total": 1, "route_type": "local_name", "matched_conditions": {}},
+        }
+        return {"data": data, "status": 200, "elapsed_ms": 0.0, "ttfb_ms": 0.0, "timings": {}, "local": True}, entry["name"]
+    directory.note_resolution(local=False)
+    return None, entry["name"]
+
+
+def resolve_local(query: str) -> tuple:
+    """기업명 인덱스 → 스냅샷 조건 검색 순으로 로컬 처리. 반환: (로컬 응답 또는 None, 서버에 보낼 쿼리)"""
+    local, query = resolve_name(query)
+    if local is None:
+        local = search_snapshot(query)
+    return local, query
+
+
+def pick_typeahead():
+    """자동 완성에서 고른 기업명을 다음 질문으로 넘기고 입력란/후보는 비움"""
+    st.session_state.pending_prompt = st.session_state.name_typeahead
+    st.session_state.name_typeahead = None
+    st.session_state.name_prefix = ""
+
+
+def split_query(prompt: str) -> list:
+    """비교 질문을 하위 쿼리로 분리 (분리할 수 없으면 [prompt])
+
+    마지막 항목에 붙은 공통 조건은 모든 항목에 붙인다. 개수 제한(MAX_FANOUT)은 호출자가 적용.
+    예) "토스 vs 카카오페이 재무제표" → ["토스 재무제표", "카카오페이 재무제표"]
+        "핀테크 and 헬스케어 in 서울" → ["핀테크 서울", "헬스케어 서울"]
+    """
+    parts = [p.strip() for p in FANOUT_SEPARATOR.split(prompt) if p.strip()]
+    if len(parts) < 2:
+        return [prompt]
+
+    # 첫 항목보다 긴 마지막 항목의 뒷부분을 공통 조건으로 취급
+    head_len = len(parts[0].split())
+    last = parts[-1].split()
+    if len(last) > head_len and all(len(p.split()) == head_len for p in parts[:-1]):
+        suffix = last[head_len:]
+        if suffix[0].lower() == "in":
+            suffix = suffix[1:]
+        parts[-1] = " ".join(last[:head_len])
+        parts = [" ".join([p, *suffix]) for p in parts]
+    return list(dict.fromkeys(parts))
+
+
+def start_search_request() -> search_client.CancelToken:
+    """세션의 현재 요청 교체. 진행 중이던 이전 요청은 취소"""
+    previous = st.session_state.get("search_token")
+    if previous is not None:
+        previous.cancel()
+    token = search_client.CancelToken()
+    st.session_state.search_token = token
+    return token
 
 
 def generate_single_company_summary(company: dict) -> str:
@@ -116,8 +458,7 @@ def generate_single_company_summary(company: dict) -> str:
     if ceo_name:
         detail_parts.append(f"대표는 **{ceo_name}**")
     if stage:
-        stage_map = {"discovery": "발굴", "review": "검토", "due_diligence": "실사", "investment": "투자", "portfolio": "포트폴리오"}
-        detail_parts.append(f"현재 {stage_map.get(stage, stage)} 단계")
+        detail_parts.append(f"현재 {STAGE_LABELS.get(stage, stage)} 단계")
     if detail_parts:
         lines.append(", ".join(detail_parts) + "입니다.")
 
@@ -220,83 +561,318 @@ def generate_summary(results: list, meta: dict) -> str:
     return f"{count}개 기업을 찾았습니다: {names_str}"
 
 
-def render_startup_results(data: dict):
-    """스타트업 검색 결과 렌더링"""
+def render_startup_results(data: dict, key: int | None = None, summary: str | None = None):
+    """스타트업 검색 결과 렌더링 (key가 있으면 페이지 단위로 표시, summary는 미리 만든 서머리)"""
     meta = data.get("meta", {})
     results = data.get("results", [])
     matched_conditions = meta.get("matched_conditions", {})
     count = len(results)
 
-    # 10개 미만이면 자연어 서머리 표시
-    if count < 10:
-        summary = generate_summary(results, meta)
-        st.markdown(summary)
-        st.markdown("---")
+    # 서머리는 필터 적용 여부가 정해진 뒤 맨 위에 채움
+    summary_slot = st.container()
+
+    render_startup_header(meta, count)
+    if key is not None and count:
+        render_export_controls(key, meta, count)
+
+    visible = results
+    if key is not None and count > 1:
+        visible = render_refine_controls(results, key)
+    refined = visible is not results
+
+    # 10개 미만이면 자연어 서머리 표시 (결과 내 필터 중이면 필터된 결과 기준)
+    if refined:
+        if 0 < len(visible) < 10:
+            with summary_slot:
+                st.markdown(generate_summary(visible, meta))
+                st.markdown("---")
+        st.caption(f"결과 내 필터: {len(visible)}건")
+        if not visible:
+            st.info("조건에 맞는 기업이 없습니다.")
+    elif count < 10:
+        with summary_slot:
+            st.markdown(summary if summary is not None else generate_summary(results, meta))
+            st.markdown("---")
+
+    shown = count if key is None else st.session_state.get(f"shown_{key}", RESULT_PAGE_SIZE)
+    for company in visible[:shown]:
+        render_company_card(company, matched_conditions)
+
+    # 필터 중에는 이미 받은 결과 안에서만 페이지 이동
+    available = len(visible) if refined else max(count, meta.get("total", count))
+    if key is not None and shown < available:
+        st.caption(f"{min(shown, len(visible))} / {available}건 표시 중")
+        if st.button("더 보기", key=f"more_{key}"):
+            try:
+                load_more_results(key, fetch=not refined)
+                st.rerun()
+            except requests.RequestException as e:
+                st.error(f"네트워크 오류: {e}")
+
+
+def get_result_index(key: int, results: list) -> ResultIndex:
+    """메시지별 결과 인덱스 (결과 목록이 바뀔 때만 다시 생성)"""
+    index = st.session_state.get(f"index_{key}")
+    if index is None or index.results is not results:
+        index = ResultIndex(results)
+        st.session_state[f"index_{key}"] = index
+    return index
+
+
+def render_refine_controls(results: list, key: int) -> list:
+    """결과 내 필터/정렬 위젯. 반환: 적용된 결과 (조건이 없으면 results 그대로)"""
+    index = get_result_index(key, results)
+
+    with st.expander("🔎 결과 내 필터 · 정렬", expanded=False):
+        filters = {}
+        fields = [f for f in REFINE_LABELS if len(index.values(f)) > 1]
+        cols = st.columns(3)
+        for n, field in enumerate(fields):
+            selected = cols[n % 3].multiselect(
+                REFINE_LABELS[field],
+                index.values(field),
+                format_func=lambda v: {"F": "여성", "M": "남성"}.get(v, v),
+                key=f"refine_{key}_{field}",
+            )
+            filters[field] = set(selected)
+
+        flag_cols = st.columns(3)
+        if flag_cols[0].checkbox("💰 엑싯만", key=f"refine_{key}_has_exit"):
+            filters["has_exit"] = {True}
+        if flag_cols[1].checkbox("🔴 자본잠식만", key=f"refine_{key}_is_capital_impaired"):
+            filters["is_capital_impaired"] = {True}
+        sort_label = flag_cols[2].selectbox("정렬", list(REFINE_SORTS), key=f"refine_{key}_sort")
+
+        valuation_range = None
+        bounds = index.valuation_bounds()
+        if bounds and bounds[0] < bounds[1]:
+            lo, hi = (v / 100_000_000 for v in bounds)
+            selected = st.slider("Pre-money (억원)", lo, hi, (lo, hi), key=f"refine_{key}_valuation")
+            if selected != (lo, hi):
+                valuation_range = (selected[0] * 100_000_000, selected[1] * 100_000_000)
+
+    sort_by, descending = REFINE_SORTS[sort_label]
+    if not any(filters.values()) and valuation_range is None and sort_by is None:
+        return results
+    return index.query(filters, valuation_range, sort_by, descending)
+
+
+def load_more_results(key: int, fetch: bool = True):
+    """다음 페이지 표시. 이미 받아온 페이지는 재사용하고 부족할 때만 서버에서 offset으로 가져온다"""
+    msg = st.session_state.messages[key]
+    data = msg["data"]
+    results = data.get("results", [])
+    shown = st.session_state.get(f"shown_{key}", RESULT_PAGE_SIZE) + RESULT_PAGE_SIZE
+
+    if fetch and len(results) < shown and len(results) < data.get("meta", {}).get("total", 0):
+        page = None
+        if msg.get("local"):
+            page = search_snapshot(msg["query"], offset=len(results), limit=RESULT_PAGE_SIZE)
+        if page is None:
+            page = call_search_api(msg["query"], offset=len(results), limit=RESULT_PAGE_SIZE)
+        if page["status"] != 200:
+            raise requests.RequestException(page["data"].get("error", {}).get("message", "페이지 조회 실패"))
+        # 캐시에 있는 원본 응답은 다른 세션과 공유되므로 복사본으로 교체
+        more = [project_company(c) for c in page["data"].get("results", [])]
+        msg["data"] = {**data, "results": results + more}
+
+    st.session_state[f"shown_{key}"] = shown
+
+
+def start_export(key: int, msg: dict, meta: dict, fmt: str):
+    """내보내기 작업 시작. 작업 스레드는 세션 상태를 읽을 수 없으므로 필요한 값은 미리 넘긴다
+
+    스냅샷 로컬 응답은 스냅샷에서, 그 외는 서버 커서 페이지를 받는 대로 파일에 기록한다.
+    """
+    pages = None
+    if msg.get("local"):
+        snapshot = get_snapshot_store().get(current_scope())
+        found = snapshot.search(msg["query"]) if snapshot is not None else None
+        if found is not None:
+            pages = [found["results"]]
+    if pages is None:
+        pages = get_search_client().iter_pages(msg["query"], current_workspace_id(), page_size=EXPORT_PAGE_SIZE)
+    job = ExportJob(fmt, max_rows=EXPORT_MAX_ROWS)
+    get_export_executor().submit(job.run, pages, meta.get("matched_conditions", {}))
+    st.session_state[f"export_job_{key}"] = job
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def render_export_progress(key: int, total: int):
+    """진행 중인 내보내기 행 수 (fragment로 주기적 갱신, 끝나면 전체 리런)"""
+    job = st.session_state.get(f"export_job_{key}")
+    if job is None or job.done:
+        st.rerun()
+    expected = min(total, job.max_rows or total)
+    st.progress(min(job.rows / expected, 1.0) if expected else 0.0, text=f"내보내는 중… {job.rows:,} / {expected:,}행")
+
+
+def render_export_controls(key: int, meta: dict, count: int):
+    """전체 결과(meta.total) CSV/XLSX 내보내기: 백그라운드 작업 → 진행 표시 → 다운로드"""
+    messages = st.session_state.messages
+    # 동시 검색 턴은 메시지가 대화에 추가되기 전에 그려지므로 다음 리런부터 표시
+    if key >= len(messages) or "query" not in messages[key]:
+        return
+    msg = messages[key]
+    total = max(count, meta.get("total", count))
+    job = st.session_state.get(f"export_job_{key}")
+
+    if job is None:
+        cols = st.columns([1, 3])
+        fmt = cols[0].selectbox("형식", available_formats(), key=f"export_format_{key}", label_visibility="collapsed")
+        if cols[1].button(f"⬇️ 전체 {total:,}건 내보내기", key=f"export_{key}"):
+            start_export(key, msg, meta, fmt)
+            st.rerun()
+        return
+
+    if not job.done:
+        st.fragment(render_export_progress, run_every=EXPORT_POLL_INTERVAL)(key, total)
+        return
 
-    st.markdown(f"**검색 결과** ({meta.get('total', len(results))}건) · `{meta.get('route_type', '-')}`")
+    cols = st.columns([3, 1])
+    if job.error:
+        cols[0].error(f"내보내기 실패 ({job.rows:,}행 기록 후 중단): {job.error}")
+    else:
+        suffix, mime = FORMATS[job.fmt]
+        # 파일은 누를 때 읽음 (읽은 뒤에는 Streamlit이 파일 전체를 메모리에 보관)
+        cols[0].download_button(
+            f"💾 {job.rows:,}행 {job.fmt} 다운로드",
+            data=functools.partial(read_file, job.path),
+            file_name=f"lattice_export{suffix}",
+            mime=mime,
+            key=f"export_download_{key}",
+            on_click="ignore",
+        )
+        if job.truncated:
+            cols[0].caption(f"최대 {job.max_rows:,}행까지만 내보냈습니다 (전체 {total:,}건).")
+    if cols[1].button("다시 내보내기", key=f"export_reset_{key}"):
+        job.discard()
+        del st.session_state[f"export_job_{key}"]
+        st.rerun()
+
+
+def render_startup_header(meta: dict, count: int):
+    """검색 결과 건수 + 적용 조건 표시"""
+    matched_conditions = meta.get("matched_conditions", {})
+
+    st.markdown(f"**검색 결과** ({meta.get('total', count)}건) · `{meta.get('route_type', '-')}`")
 
     if matched_conditions:
         st.caption(f"적용 조건: {matched_conditions}")
     if meta.get("reference_company"):
         st.caption(f"참조 기업: {meta['reference_company']}")
 
-    for company in results:
-        # 뱃지 생성
-        badges = []
-        if company.get("is_capital_impaired"):
-            badges.append("🔴 자본잠식")
-        if company.get("has_exit"):
-            badges.append("💰 엑싯")
-        badge_str = " ".join(badges)
-
-        title = f"**{company['name']}** - {company.get('industry', '-')}"
-        if badge_str:
-            title += f"  {badge_str}"
-
-        with st.expander(title):
-            # 기본 4컬럼
-            cols = st.columns(4)
-            cols[0].markdown(f"**대표:** {company.get('ceo_name', '-')}")
-            cols[1].markdown(f"**지역:** {company.get('region', '-')}")
-            cols[2].markdown(f"**라운드:** {company.get('round', '-')}")
-            cols[3].markdown(f"**단계:** {company.get('stage', '-')}")
-
-            # 동적 필드 (matched_conditions 기반)
-            dynamic_fields = []
-            if "capital_impairment" in matched_conditions:
-                status = "자본잠식" if company.get("is_capital_impaired") else "자본잠식 아님"
-                dynamic_fields.append(f"**자본상태:** {status}")
-            if "ceo_gender" in matched_conditions:
-                gender = {"F": "여성", "M": "남성"}.get(company.get("ceo_gender"), "-")
-                dynamic_fields.append(f"**대표 성별:** {gender}")
-            if "has_exit" in matched_conditions:
-                exit_status = "O" if company.get("has_exit") else "X"
-                dynamic_fields.append(f"**엑싯:** {exit_status}")
-            if "sourcing_channel" in matched_conditions:
-                dynamic_fields.append(f"**발굴채널:** {company.get('sourcing_channel', '-')}")
-
-            if dynamic_fields:
-                st.markdown(" · ".join(dynamic_fields))
-
-            if company.get("investment_date"):
-                st.caption(f"투자일: {company['investment_date']}")
-            if company.get("summary"):
-                st.markdown(company["summary"])
-            if company.get("technologies"):
-                st.markdown(f"**기술:** {company['technologies']}")
-            if company.get("pre_money_valuation"):
-                val = company["pre_money_valuation"]
-                st.markdown(f"**Pre-money:** {val / 100_000_000:.0f}억원")
-
-
-def render_analytics_results(data: dict):
-    """통계 결과 렌더링"""
+
+def render_company_card(company: dict, matched_conditions: dict):
+    """기업 1건 카드 (expander) 렌더링"""
+    # 뱃지 생성
+    badges = []
+    if company.get("is_capital_impaired"):
+        badges.append("🔴 자본잠식")
+    if company.get("has_exit"):
+        badges.append("💰 엑싯")
+    badge_str = " ".join(badges)
+
+    title = f"**{company['name']}** - {company.get('industry', '-')}"
+    if badge_str:
+        title += f"  {badge_str}"
+
+    with st.expander(title):
+        # 기본 4컬럼
+        cols = st.columns(4)
+        cols[0].markdown(f"**대표:** {company.get('ceo_name', '-')}")
+        cols[1].markdown(f"**지역:** {company.get('region', '-')}")
+        cols[2].markdown(f"**라운드:** {company.get('round', '-')}")
+        cols[3].markdown(f"**단계:** {company.get('stage', '-')}")
+
+        # 동적 필드 (matched_conditions 기반)
+        dynamic = dynamic_fields(company, matched_conditions)
+        if dynamic:
+            st.markdown(" · ".join(f"**{label}:** {value}" for label, value in dynamic))
+
+        if company.get("investment_date"):
+            st.caption(f"투자일: {company['investment_date']}")
+        if company.get("summary"):
+            st.markdown(company["summary"])
+        if company.get("technologies"):
+            st.markdown(f"**기술:** {company['technologies']}")
+        if company.get("pre_money_valuation"):
+            val = company["pre_money_valuation"]
+            st.markdown(f"**Pre-money:** {val / 100_000_000:.0f}억원")
+
+
+def get_analytics_table(key: int | None, rows: list) -> AnalyticsTable:
+    """메시지별 통계 Arrow 테이블 (행 목록이 바뀔 때만 다시 변환)"""
+    if key is None:
+        return AnalyticsTable(rows)
+    table = st.session_state.get(f"table_{key}")
+    if table is None or table.rows is not rows:
+        table = AnalyticsTable(rows)
+        st.session_state[f"table_{key}"] = table
+    return table
+
+
+def render_analytics_controls(table: AnalyticsTable, key: int) -> tuple:
+    """통계 결과 정렬/그룹 위젯. 반환: (정렬 열, 내림차순, 그룹 열)"""
+    with st.expander("🔎 정렬 · 그룹", expanded=False):
+        cols = st.columns(3)
+        group_by = cols[0].selectbox("그룹", ["(없음)", *table.columns], key=f"analytics_{key}_group")
+        group_by = None if group_by == "(없음)" else group_by
+        sort_options = table.view(group_by=group_by).column_names
+        sort_by = cols[1].selectbox("정렬", ["기본", *sort_options], key=f"analytics_{key}_sort")
+        descending = cols[2].checkbox("내림차순", value=True, key=f"analytics_{key}_desc")
+    return (None if sort_by == "기본" else sort_by), descending, group_by
+
+
+def load_more_analytics(key: int):
+    """서버에서 통계 결과 다음 구간을 offset으로 받아 이어 붙임"""
+    msg = st.session_state.messages[key]
+    data = msg["data"]
+    rows = data.get("data", [])
+    page = call_search_api(msg["query"], offset=len(rows), limit=ANALYTICS_PAGE_SIZE)
+    if page["status"] != 200:
+        raise requests.RequestException(page["data"].get("error", {}).get("message", "추가 조회 실패"))
+    msg["data"] = {**data, "data": rows + page["data"].get("data", [])}
+
+
+def render_analytics_results(data: dict, key: int | None = None):
+    """통계 결과 렌더링 (Arrow 테이블로 한 번 변환, 정렬/그룹/페이지는 로컬 처리)"""
     meta = data.get("meta", {})
     st.markdown(f"**📊 통계 결과**")
     st.caption(meta.get("description", ""))
 
-    if data.get("data"):
-        st.dataframe(data["data"], use_container_width=True)
+    rows = data.get("data")
+    if rows:
+        table = get_analytics_table(key, rows)
+        view = table.table
+        if key is not None and table.num_rows > 1:
+            view = table.view(*render_analytics_controls(table, key))
+
+        offset = 0
+        if key is not None and view.num_rows > ANALYTICS_PAGE_SIZE:
+            pages = -(-view.num_rows // ANALYTICS_PAGE_SIZE)
+            # 그룹 변경 등으로 페이지 수가 줄면 마지막 페이지로
+            if st.session_state.get(f"analytics_{key}_page", 1) > pages:
+                st.session_state[f"analytics_{key}_page"] = pages
+            page = st.number_input("페이지", 1, pages, 1, key=f"analytics_{key}_page")
+            offset = (page - 1) * ANALYTICS_PAGE_SIZE
+            st.caption(f"{offset + 1}–{min(offset + ANALYTICS_PAGE_SIZE, view.num_rows)} / {view.num_rows}행")
+        st.dataframe(view.slice(offset, ANALYTICS_PAGE_SIZE), hide_index=True, use_container_width=True)
+
+        # 서버에 남은 행이 있으면 구간 단위로 추가 조회
+        total = meta.get("total")
+        if key is not None and total and total > len(rows):
+            st.caption(f"{len(rows)} / {total}행 불러옴")
+            if st.button("더 불러오기", key=f"more_analytics_{key}"):
+                try:
+                    load_more_analytics(key)
+                    st.rerun()
+                except requests.RequestException as e:
+                    st.error(f"네트워크 오류: {e}")
     else:
         st.info("집계 결과가 없습니다.")
 
@@ -327,9 +903,10 @@ def render_web_results(data: dict):
         st.markdown(f"[{i}] {r.get('link', '')}")
 
 
+@lru_cache(maxsize=4096)
 def format_krw(value):
-    """숫자를 한국 원화 형식으로 포맷"""
-    if value is None:
+    """숫자를 한국 원화 형식으로 포맷 (같은 값은 캐시)"""
+    if value is None or value != value:  # None 또는 NaN
         return "-"
     if abs(value) >= 100_000_000:
         return f"{value / 100_000_000:,.0f}억원"
@@ -339,6 +916,117 @@ def format_krw(value):
         return f"{value:,.0f}원"
 
 
+# 재무제표 핵심 지표 (라벨, 필드)
+SUMMARY_METRICS = [
+    ("매출액", "revenue"),
+    ("영업이익", "operating_profit"),
+    ("당기순이익", "net_income"),
+    ("총자산", "total_assets"),
+    ("자본총계", "total_equity"),
+]
+
+# 상세 재무제표 (표 제목, [(라벨, 필드)])
+FINANCIAL_TABLES = [
+    ("손익계산서", [
+        ("매출액", "revenue"),
+        ("매출원가", "cost_of_sales"),
+        ("매출총이익", "gross_profit"),
+        ("판관비", "selling_general_administrative_expenses"),
+        ("영업이익", "operating_profit"),
+        ("영업외수익", "non_operating_income"),
+        ("영업외비용", "non_operating_expenses"),
+        ("법인세차감전손익", "profit_before_tax_expense"),
+        ("법인세", "income_tax_expense"),
+        ("당기순이익", "net_income"),
+    ]),
+    ("재무상태표 (자산)", [
+        ("유동자산", "current_assets"),
+        ("당좌자산", "quick_assets"),
+        ("재고자산", "inventory_assets"),
+        ("비유동자산", "non_current_assets"),
+        ("투자자산", "investment_assets"),
+        ("유형자산", "tangible_assets"),
+        ("무형자산", "intangible_assets"),
+        ("기타비유동자산", "other_non_current_assets"),
+        ("자산총계", "total_assets"),
+    ]),
+    ("재무상태표 (부채/자본)", [
+        ("유동부채", "current_liabilities"),
+        ("비유동부채", "non_current_liabilities"),
+        ("부채총계", "total_liabilities"),
+        ("자본금", "capital"),
+        ("자본잉여금", "capital_surplus"),
+        ("자본조정", "capital_adjustment"),
+        ("기타포괄손익누계", "accumulated_other_comprehensive_income"),
+        ("이익잉여금", "retained_earnings"),
+        ("결손금", "deficit"),
+        ("자본총계", "total_equity"),
+    ]),
+]
+
+
+# 비교 표에 쓰는 재무제표 필드 (상세 재무제표 순서)
+FINANCIAL_FIELDS = list(dict.fromkeys(field for _, rows in FINANCIAL_TABLES for _, field in rows))
+
+# 웹검색 결과에서 렌더링하는 필드
+WEB_FIELDS = ("title", "link", "snippet")
+
+# 요청 payload "fields"로 보내는 응답 타입별 필드 (렌더러/서머리가 실제로 읽는 것만)
+WIRE_FIELDS = {
+    "company": list(COMPANY_FIELDS),
+    "financial": {
+        "company": ["name"],
+        "summary": [field for _, field in SUMMARY_METRICS],
+        "full": FINANCIAL_FIELDS,
+    },
+    "web": list(WEB_FIELDS),
+}
+
+# 비교 지표 선택지: 라벨 → (종류, 키)
+COMPARISON_METRICS = {
+    **{label: ("field", field) for _, rows in FINANCIAL_TABLES for label, field in rows},
+    **{label: ("ratio", key) for label, key in RATIOS},
+}
+
+
+def get_financial_panel(messages: list) -> FinancialPanel | None:
+    """재무제표 응답 메시지들로 비교 패널 생성 (메시지 구성이 바뀔 때만 다시 생성)"""
+    financial = [m for m in messages if m.get("status") == 200 and m["data"].get("type") == "financial"]
+    if len(financial) < 2:
+        return None
+    ids = tuple(m.get("id") for m in financial)
+    cached = st.session_state.get("financial_panel")
+    if cached is None or cached[0] != ids:
+        cached = (ids, FinancialPanel([m["data"] for m in financial], FINANCIAL_FIELDS))
+        st.session_state.financial_panel = cached
+    return cached[1]
+
+
+def render_financial_comparison(panel: FinancialPanel, key: str):
+    """기업 × 기간 비교 표 (지표 1개 선택) + 최근 기간 비율 요약"""
+    labels = list(COMPARISON_METRICS)
+    metric = st.selectbox("지표", labels, index=labels.index("영업이익률"), key=f"fin_metric_{key}")
+    kind, name = COMPARISON_METRICS[metric]
+    if kind == "ratio":
+        grid = format_grid(panel.ratios()[name], format_ratio)
+    else:
+        grid = format_grid(panel.field(name), format_krw)
+
+    table = {"기업": panel.companies}
+    for j, period in enumerate(panel.periods):
+        table[period_label(period)] = [row[j] for row in grid]
+    st.dataframe(table, hide_index=True, use_container_width=True)
+
+    # 기업별 가장 최근 기간의 비율
+    ratios = panel.ratios()
+    rows = np.arange(len(panel.companies))
+    latest = panel.latest_index()
+    summary = {"기업": panel.companies, "기간": [period_label(panel.periods[j]) for j in latest]}
+    for label, ratio_key in RATIOS:
+        summary[label] = [format_ratio(float(v)) for v in ratios[ratio_key][rows, latest]]
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+
+
 def render_financial_results(data: dict):
     """재무제표 결과 렌더링"""
     company = data.get("company", {})
@@ -355,70 +1043,19 @@ def render_financial_results(data: dict):
 
     # 요약 (핵심 지표)
     st.subheader("핵심 지표")
-    cols = st.columns(5)
-    cols[0].metric("매출액", format_krw(summary.get("revenue")))
-    cols[1].metric("영업이익", format_krw(summary.get("operating_profit")))
-    cols[2].metric("당기순이익", format_krw(summary.get("net_income")))
-    cols[3].metric("총자산", format_krw(summary.get("total_assets")))
-    cols[4].metric("자본총계", format_krw(summary.get("total_equity")))
+    cols = st.columns(len(SUMMARY_METRICS))
+    for col, (label, field) in zip(cols, SUMMARY_METRICS):
+        col.metric(label, format_krw(summary.get(field)))
 
     # 상세 (펼치기)
     with st.expander("📋 상세 재무제표", expanded=False):
-        # 손익계산서
-        st.markdown("**손익계산서**")
-        income_data = {
-            "항목": ["매출액", "매출원가", "매출총이익", "판관비", "영업이익", "영업외수익", "영업외비용", "법인세차감전손익", "법인세", "당기순이익"],
-            "금액": [
-                format_krw(full.get("revenue")),
-                format_krw(full.get("cost_of_sales")),
-                format_krw(full.get("gross_profit")),
-                format_krw(full.get("selling_general_administrative_expenses")),
-                format_krw(full.get("operating_profit")),
-                format_krw(full.get("non_operating_income")),
-                format_krw(full.get("non_operating_expenses")),
-                format_krw(full.get("profit_before_tax_expense")),
-                format_krw(full.get("income_tax_expense")),
-                format_krw(full.get("net_income")),
-            ]
-        }
-        st.dataframe(income_data, hide_index=True, use_container_width=True)
-
-        # 재무상태표 - 자산
-        st.markdown("**재무상태표 (자산)**")
-        asset_data = {
-            "항목": ["유동자산", "당좌자산", "재고자산", "비유동자산", "투자자산", "유형자산", "무형자산", "기타비유동자산", "자산총계"],
-            "금액": [
-                format_krw(full.get("current_assets")),
-                format_krw(full.get("quick_assets")),
-                format_krw(full.get("inventory_assets")),
-                format_krw(full.get("non_current_assets")),
-                format_krw(full.get("investment_assets")),
-                format_krw(full.get("tangible_assets")),
-                format_krw(full.get("intangible_assets")),
-                format_krw(full.get("other_non_current_assets")),
-                format_krw(full.get("total_assets")),
-            ]
-        }
-        st.dataframe(asset_data, hide_index=True, use_container_width=True)
-
-        # 재무상태표 - 부채/자본
-        st.markdown("**재무상태표 (부채/자본)**")
-        liability_data = {
-            "항목": ["유동부채", "비유동부채", "부채총계", "자본금", "자본잉여금", "자본조정", "기타포괄손익누계", "이익잉여금", "결손금", "자본총계"],
-            "금액": [
-                format_krw(full.get("current_liabilities")),
-                format_krw(full.get("non_current_liabilities")),
-                format_krw(full.get("total_liabilities")),
-                format_krw(full.get("capital")),
-                format_krw(full.get("capital_surplus")),
-                format_krw(full.get("capital_adjustment")),
-                format_krw(full.get("accumulated_other_comprehensive_income")),
-                format_krw(full.get("retained_earnings")),
-                format_krw(full.get("deficit")),
-                format_krw(full.get("total_equity")),
-            ]
-        }
-        st.dataframe(liability_data, hide_index=True, use_container_width=True)
+        for title, rows in FINANCIAL_TABLES:
+            st.markdown(f"**{title}**")
+            table = {
+                "항목": [label for label, _ in rows],
+                "금액": [format_krw(full.get(field)) for _, field in rows],
+            }
+            st.dataframe(table, hide_index=True, use_container_width=True)
 
     if meta.get("updated_at"):
         st.caption(f"업데이트: {meta['updated_at'][:10]}")
@@ -430,19 +1067,19 @@ def render_error(data: dict):
     st.error(f"⚠️ {error.get('message', '알 수 없는 오류')}")
 
 
-def render_response(data: dict, status: int):
-    """응답 타입에 따라 렌더링"""
+def render_response(data: dict, status: int, key: int | None = None, summary: str | None = None):
+    """응답 타입에 따라 렌더링 (key: 메시지 인덱스, 위젯 키 구분용)"""
     if status != 200:
         render_error(data)
     elif data.get("type") == "analytics":
-        render_analytics_results(data)
+        render_analytics_results(data, key)
     elif data.get("type") == "financial":
         render_financial_results(data)
     elif data.get("type") == "web":
         render_web_results(data)
     elif data.get("results") is not None:
         if data.get("results"):
-            render_startup_results(data)
+            render_startup_results(data, key, summary)
         else:
             st.warning("검색 결과가 없습니다.")
             if data.get("suggestions"):
@@ -451,91 +1088,542 @@ def render_response(data: dict, status: int):
         render_error(data)
 
 
-# 로그인 화면
-if not st.session_state.logged_in:
-    st.title("🔐 Lattice 로그인")
+def describe_response(data: dict, status: int) -> str:
+    """접힌 이전 턴에 표시할 한 줄 요약"""
+    if status != 200:
+        return "⚠️ " + data.get("error", {}).get("message", "오류")
+    if data.get("type") == "analytics":
+        return "📊 통계 결과"
+    if data.get("type") == "financial":
+        period = data.get("period", {})
+        return f"📈 {data.get('company', {}).get('name', '')} 재무제표 · {period.get('year', '')}년 {period.get('quarter', '')}"
+    if data.get("type") == "web":
+        return f"🌐 웹 검색 결과 {len(data.get('results', []))}건"
+    if data.get("results"):
+        meta = data.get("meta", {})
+        names = ", ".join(r.get("name", "") for r in data["results"][:3])
+        return f"🏢 검색 결과 {meta.get('total', len(data['results']))}건 · {names}"
+    return "검색 결과 없음"
+
+
+def project_company(company: dict) -> dict:
+    """기업 레코드에서 COMPANY_FIELDS만 추출"""
+    return {k: company[k] for k in COMPANY_FIELDS if k in company}
+
+
+def compact_response(data: dict) -> dict:
+    """렌더링에 필요한 필드만 남긴 응답 (원본은 PayloadStore에 보관)"""
+    if data.get("type") == "financial":
+        summary_fields = set(WIRE_FIELDS["financial"]["summary"])
+        full_fields = set(FINANCIAL_FIELDS)
+        return {
+            **data,
+            "company": {"name": data.get("company", {}).get("name", "")},
+            "summary": {k: v for k, v in data.get("summary", {}).items() if k in summary_fields},
+            "full": {k: v for k, v in data.get("full", {}).items() if k in full_fields},
+        }
+    if data.get("type") == "web":
+        return {
+            **data,
+            "results": [
+                {k: r.get(k, "") for k in WEB_FIELDS} for r in data.get("results", [])
+            ],
+        }
+    if data.get("type") is None and data.get("results"):
+        return {**data, "results": [project_company(c) for c in data["results"]]}
+    return data
 
-    with st.form("login_form"):
-        alias_input = st.text_input("워크스페이스 ID", placeholder="워크스페이스 ID 입력")
-        password_input = st.text_input("비밀번호", type="password", placeholder="비밀번호 (필요시)")
-        submitted = st.form_submit_button("로그인", type="primary")
 
-    if submitted:
-        if alias_input:
-            success, error_msg = login(alias_input, password_input)
-            if success:
-                st.rerun()
-            else:
-                st.error(error_msg)
-        else:
-            st.warning("워크스페이스 ID를 입력하세요.")
+def freeze_message(msg: dict, timer: TurnTimer | None = None):
+    """완료된 턴의 렌더링용 값(요약 한 줄, 서머리)을 한 번만 계산하고 원본은 디스크로 내린다
 
-else:
-    # 헤더
-    col1, col2 = st.columns([4, 1])
-    with col1:
-        st.title("🔍 Lattice")
-    with col2:
-        if st.session_state.is_admin:
-            st.markdown("**🔑 Admin**")
-        else:
-            st.markdown(f"**{st.session_state.workspace_alias}**")
-        if st.button("로그아웃"):
-            logout()
-            st.rerun()
+    원본은 디버그 패널(admin 전용)에서만 읽으므로 admin 세션만 저장한다.
+    """
+    timer = timer or TurnTimer()
+    data, status = msg["data"], msg["status"]
+    msg["stub"] = describe_response(data, status)
 
-    # 안내 메시지
-    st.info("""
-    **지원 기능:**
-    - 🏢 **스타트업 검색**: "토스", "핀테크", "서울 시리즈A", "토스같은", "자본잠식 기업"
-    - 📈 **재무제표**: "A기업 재무제표", "B사 2024년 실적"
-    - 🌐 **웹검색**: "AI 최신 뉴스", "테슬라 주가"
-    - 📊 **통계**: "핀테크 몇 개?", "산업별 분포"
-    """)
+    results = data.get("results") or []
+    if status == 200 and data.get("type") is None and 0 < len(results) < 10:
+        with timer.phase("summary"):
+            msg["summary"] = generate_summary(results, data.get("meta", {}))
 
-    # Admin 디버그 모드
+    msg["id"] = uuid.uuid4().hex
     if st.session_state.is_admin:
-        st.session_state.debug_mode = st.checkbox("🐛 디버그 모드", value=st.session_state.debug_mode)
+        get_payload_store().put(st.session_state.session_key, msg["id"], data)
+    msg["data"] = compact_response(data)
 
-    # 채팅 히스토리 표시
-    for msg in st.session_state.messages:
-        with st.chat_message(msg["role"]):
-            if msg["role"] == "user":
-                st.markdown(msg["content"])
-            else:
-                render_response(msg["data"], msg["status"])
 
-                # 디버그 모드
+def turn_route_type(data: dict, status: int) -> str:
+    """메트릭 라벨용 경로 타입"""
+    if status != 200:
+        return "error"
+    if data.get("type") in ("analytics", "financial", "web"):
+        return data["type"]
+    return data.get("meta", {}).get("route_type") or "startup"
+
+
+def record_turn_metrics(msg: dict, timer: TurnTimer):
+    """네트워크 단계(클라이언트 측정) + 서머리/렌더링 단계를 합쳐 메시지와 메트릭에 기록"""
+    phases = {name.removesuffix("_ms"): ms for name, ms in (msg.get("timings") or {}).items()}
+    phases.update(timer.phases)
+    msg["phases"] = phases
+
+    if msg.get("local"):
+        source = "local"
+    elif msg.get("cached"):
+        source = "cache"
+    elif msg.get("coalesced"):
+        source = "coalesced"
+    else:
+        source = "upstream"
+    get_metrics().record_turn(
+        st.session_state.workspace_alias or "admin",
+        turn_route_type(msg["data"], msg["status"]),
+        phases,
+        source=source,
+        wire_bytes=(msg.get("bytes") or {}).get("wire"),
+        body_bytes=(msg.get("bytes") or {}).get("body"),
+    )
+
+
+def render_message(i: int, msg: dict):
+    """대화 메시지 1건 전체 렌더링"""
+    with st.chat_message(msg["role"]):
+        if msg["role"] == "user":
+            st.markdown(msg["content"])
+        else:
+            render_answer(i, msg)
+
+
+def render_answer(i: int, msg: dict):
+    """응답 메시지 본문 (+ 디버그 패널)"""
+    render_response(msg["data"], msg["status"], key=i, summary=msg.get("summary"))
+
+    # 디버그 모드
+    if st.session_state.debug_mode:
+        render_debug(msg)
+
+
+def render_group(indexes: list, messages: list):
+    """비교 질문 하위 응답들을 한 메시지 안에 나란히 렌더링"""
+    with st.chat_message("assistant"):
+        for col, i in zip(st.columns(len(indexes)), indexes):
+            with col:
+                st.caption(f"🔀 {messages[i]['query']}")
+                render_answer(i, messages[i])
+
+        render_dropped_queries(messages[indexes[0]].get("dropped"))
+        render_group_comparison([messages[i] for i in indexes])
+
+
+def render_dropped_queries(dropped: list | None):
+    """비교 개수 제한(MAX_FANOUT)으로 보내지 않은 항목 안내"""
+    if dropped:
+        st.caption(f"⚠️ 한 번에 {MAX_FANOUT}개까지 비교합니다. 제외된 항목: {', '.join(dropped)}")
+
+
+def render_group_comparison(group: list):
+    """재무제표끼리 비교한 질문이면 하위 응답 아래에 비교 표 추가"""
+    financial = [m for m in group if m["data"].get("type") == "financial"]
+    if len(financial) < 2 or any(m["status"] != 200 for m in financial):
+        return
+    panel = FinancialPanel([m["data"] for m in financial], FINANCIAL_FIELDS)
+    if panel.shape != (1, 1):
+        with st.expander("📊 재무제표 비교", expanded=True):
+            render_financial_comparison(panel, key=group[0]["group"])
+
+
+def history_cutoff(messages: list) -> int:
+    """최근 HISTORY_FULL_TURNS 턴이 시작되는 메시지 인덱스"""
+    user_indexes = [i for i, m in enumerate(messages) if m["role"] == "user"]
+    if len(user_indexes) <= HISTORY_FULL_TURNS:
+        return 0
+    return user_indexes[-HISTORY_FULL_TURNS]
+
+
+def render_history(messages: list):
+    """채팅 히스토리. 이전 턴은 토글 한 개로 접고, 펼쳐도 턴별 한 줄 요약만 그린다"""
+    cutoff = history_cutoff(messages)
+
+    if cutoff:
+        older = [(i, m) for i, m in enumerate(messages[:cutoff]) if m["role"] == "assistant"]
+        if st.toggle(f"이전 대화 {len(older)}건 보기", key="show_older_history"):
+            for i, msg in older:
+                label = f"{msg.get('query', '')} → {msg.get('stub') or describe_response(msg['data'], msg['status'])}"
+                if st.toggle(label, key=f"expand_{i}"):
+                    if messages[i - 1]["role"] == "user":
+                        render_message(i - 1, messages[i - 1])
+                    render_message(i, msg)
+
+    i = cutoff
+    while i < len(messages):
+        # 같은 비교 질문에서 나온 연속된 응답은 나란히 표시
+        group = messages[i].get("group")
+        end = i + 1
+        while group and end < len(messages) and messages[end].get("group") == group:
+            end += 1
+        if group:
+            render_group(list(range(i, end)), messages)
+        else:
+            render_message(i, messages[i])
+        i = end
+
+
+def run_fanout(queries: list, cancel: search_client.CancelToken):
+    """하위 쿼리를 동시에 보내고 끝나는 순서대로 각 칸에 렌더링. 메시지는 쿼리 순서로 추가
+
+    MAX_FANOUT개를 넘는 하위 쿼리는 보내지 않고 첫 응답에 제외 목록으로 남긴다.
+    """
+    queries, dropped = queries[:MAX_FANOUT], queries[MAX_FANOUT:]
+    client = get_search_client()
+    workspace_id = current_workspace_id()
+    base = len(st.session_state.messages)
+    group = uuid.uuid4().hex
+
+    slots = []
+    for col, query in zip(st.columns(len(queries)), queries):
+        with col:
+            st.caption(f"🔀 {query}")
+            slots.append(st.empty())
+
+    turn_started = time.perf_counter()
+    # 기업명/스냅샷으로 바로 답할 수 있는 하위 쿼리는 로컬 응답, 나머지만 서버로
+    resolved = [resolve_local(query) for query in queries]
+    queries = [query for _, query in resolved]
+    futures = {
+        get_fanout_executor().submit(client.search, query, workspace_id, cancel=cancel): n
+        for n, (local, query) in enumerate(resolved)
+        if local is None
+    }
+    local_results = [(n, local) for n, (local, _) in enumerate(resolved) if local is not None]
+    messages = [None] * len(queries)
+    try:
+        for n, outcome in itertools.chain(local_results, ((futures[f], f) for f in as_completed(futures))):
+            query = queries[n]
+            timer = TurnTimer()
+            try:
+                result = outcome if isinstance(outcome, dict) else outcome.result()
+            except search_client.SearchCancelled:
+                raise
+            except requests.RequestException as e:
+                # 실패한 하위 쿼리는 오류 응답으로 남기고 나머지는 계속 표시
+                message = "요청 시간 초과" if isinstance(e, requests.Timeout) else f"네트워크 오류: {e}"
+                result = {"data": {"error": {"message": message}}, "status": 0}
+            get_prefetcher().note_result(query, workspace_id, result)
+            if result["status"] == 200:
+                get_name_directory().note_response(client.scope(workspace_id), result["data"], project_company)
+
+            msg = {"role": "assistant", "query": query, "group": group, **result}
+            freeze_message(msg, timer)
+            with slots[n].container():
+                with timer.phase("render"):
+                    render_response(result["data"], result["status"], key=base + n, summary=msg.get("summary"))
                 if st.session_state.debug_mode:
-                    with st.expander("🐛 Debug", expanded=False):
-                        st.json(msg["data"])
-
-    # 채팅 입력
-    if prompt := st.chat_input("검색어를 입력하세요..."):
-        # 사용자 메시지 추가
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        with st.chat_message("user"):
-            st.markdown(prompt)
-
-        # API 호출 및 응답
-        with st.chat_message("assistant"):
-            with st.spinner("검색 중..."):
-                try:
-                    result = call_search_api(prompt)
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "data": result["data"],
-                        "status": result["status"],
-                    })
-                    render_response(result["data"], result["status"])
-
-                    if st.session_state.debug_mode:
-                        with st.expander("🐛 Debug", expanded=False):
-                            st.json(result["data"])
-
-                except requests.Timeout:
-                    st.error("요청 시간 초과. 다시 시도해주세요.")
-                except requests.RequestException as e:
-                    st.error(f"네트워크 오류: {e}")
-                except Exception as e:
-                    st.error(f"오류 발생: {e}")
+                    render_debug(msg)
+            timer.add("total", (time.perf_counter() - turn_started) * 1000)
+            record_turn_metrics(msg, timer)
+            messages[n] = msg
+
+            if result["status"] == 200 and result["data"].get("type") is None:
+                prefetch_financials(result["data"])
+    finally:
+        # 취소/오류로 빠져나가면 남은 하위 쿼리도 중단
+        if any(msg is None for msg in messages):
+            cancel.cancel()
+
+    if dropped:
+        messages[0]["dropped"] = dropped
+    render_dropped_queries(dropped)
+    render_group_comparison(messages)
+    st.session_state.messages.extend(messages)
+
+
+class StreamingStartupView:
+    """스트리밍 스타트업 검색 결과를 도착 순서대로 그리는 뷰
+
+    meta가 오면 헤더를, result가 올 때마다 기업 카드를 바로 추가한다.
+    스트림이 끝나면 서머리 · 더 보기 · 결과 내 필터 · 내보내기가 있는 일반 결과 화면으로 바꿔 그린다.
+    """
+
+    def __init__(self):
+        self.placeholder = st.empty()
+        self.started = False
+        self.meta = {}
+        self.count = 0
+        self.render_ms = 0.0
+
+    def on_event(self, event: str, value):
+        started = time.perf_counter()
+        try:
+            self._on_event(event, value)
+        finally:
+            self.render_ms += (time.perf_counter() - started) * 1000
+
+    def _on_event(self, event: str, value):
+        if event == "meta" and not self.started:
+            self._start(value or {})
+        elif event == "result":
+            if not self.started:
+                self._start({})
+            self.count += 1
+            with self.cards:
+                render_company_card(value, self.meta.get("matched_conditions", {}))
+
+    def _start(self, meta: dict):
+        self.started = True
+        self.meta = meta
+        box = self.placeholder.container()
+        with box:
+            render_startup_header(meta, self.count)
+            self.cards = st.container()
+
+    def finish(self, data: dict, status: int, key: int | None = None, summary: str | None = None):
+        """최종 응답으로 마무리. 스트리밍으로 그린 카드는 같은 자리의 전체 결과 화면으로 교체"""
+        self.placeholder.empty()
+        with self.placeholder.container():
+            render_response(data, status, key, summary)
+
+
+def render_debug(msg: dict):
+    """디버그 패널 (응답 시간 + 원본 JSON, 원본은 요청 시 디스크에서 로드)"""
+    with st.expander("🐛 Debug", expanded=False):
+        meta = msg["data"].get("meta", {})
+        if meta.get("route_type") == "local_snapshot":
+            refreshed = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(meta["snapshot_refreshed"]))
+            st.caption(
+                f"💽 스냅샷 로컬 응답 · 버전 {meta.get('snapshot_version') or '-'} · 갱신 {refreshed} · "
+                f"{msg['elapsed_ms']:.1f}ms"
+            )
+        elif msg.get("local"):
+            st.caption("📇 기업명 인덱스 로컬 응답")
+        elif msg.get("cached"):
+            st.caption("💾 캐시 응답")
+        elif msg.get("coalesced"):
+            st.caption(f"🔗 병합된 응답 · 업스트림 {msg['elapsed_ms']:.0f}ms")
+        elif msg.get("elapsed_ms") is not None:
+            st.caption(f"⏱ 전체 {msg['elapsed_ms']:.0f}ms · 헤더 수신 {msg['ttfb_ms']:.0f}ms")
+        sizes = msg.get("bytes") or {}
+        if sizes.get("wire") is not None:
+            body = f" (압축 해제 {sizes['body'] / 1024:,.1f}KB)" if sizes.get("body") is not None else ""
+            st.caption(f"📦 전송 {sizes['wire'] / 1024:,.1f}KB{body} · 디코딩 {msg['timings'].get('decode_ms', 0.0):.1f}ms")
+        if msg.get("phases"):
+            st.caption("🧭 " + " · ".join(
+                f"{phase} {msg['phases'][phase]:.0f}ms" for phase in PHASES if phase in msg["phases"]
+            ))
+        if msg.get("timeout_s") is not None:
+            hedged = " · 헤지 요청 사용" if msg.get("hedged") else ""
+            st.caption(f"⏳ 타임아웃 {msg['timeout_s']:.1f}s (추정 경로: {msg['route_guess']}){hedged}")
+
+        # expander 내용은 접혀 있어도 실행되므로 토글로 지연 로드
+        if st.toggle("원본 JSON 불러오기", key=f"raw_{msg['id']}"):
+            raw = get_payload_store().get(st.session_state.session_key, msg["id"])
+            if raw is None:
+                st.info("세션 저장 용량 제한으로 원본이 삭제되었습니다.")
+            else:
+                st.json(raw)
+
+
+def main():
+    """앱 화면 (로그인 / 검색). 모듈 import 시에는 실행하지 않음"""
+    # 로그인 화면
+    if not st.session_state.logged_in:
+        st.title("🔐 Lattice 로그인")
+
+        with st.form("login_form"):
+            alias_input = st.text_input("워크스페이스 ID", placeholder="워크스페이스 ID 입력")
+            password_input = st.text_input("비밀번호", type="password", placeholder="비밀번호 (필요시)")
+            submitted = st.form_submit_button("로그인", type="primary")
+
+        if submitted:
+            if alias_input:
+                success, error_msg = login(alias_input, password_input)
+                if success:
+                    st.rerun()
+                else:
+                    st.error(error_msg)
+            else:
+                st.warning("워크스페이스 ID를 입력하세요.")
+
+    else:
+        # 헤더
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.title("🔍 Lattice")
+        with col2:
+            if st.session_state.is_admin:
+                st.markdown("**🔑 Admin**")
+            else:
+                st.markdown(f"**{st.session_state.workspace_alias}**")
+            if st.button("로그아웃"):
+                logout()
+                st.rerun()
+
+        # 안내 메시지
+        st.info("""
+        **지원 기능:**
+        - 🏢 **스타트업 검색**: "토스", "핀테크", "서울 시리즈A", "토스같은", "자본잠식 기업"
+        - 📈 **재무제표**: "A기업 재무제표", "B사 2024년 실적"
+        - 🌐 **웹검색**: "AI 최신 뉴스", "테슬라 주가"
+        - 📊 **통계**: "핀테크 몇 개?", "산업별 분포"
+        """)
+
+        st.toggle("📈 상위 기업 재무제표 미리 불러오기", key="prefetch_financials")
+        st.toggle("🔀 비교 질문 나눠서 동시 검색 (vs / and)", key="multi_query")
+        if SNAPSHOT_URL:
+            st.toggle("💽 조건 검색은 로컬 스냅샷으로 (서울 시리즈A 등)", key="snapshot_mode")
+
+        # Admin 디버그 모드
+        if st.session_state.is_admin:
+            st.session_state.debug_mode = st.checkbox("🐛 디버그 모드", value=st.session_state.debug_mode)
+
+            if st.session_state.debug_mode:
+                cache = get_result_cache()
+                stats = cache.stats()
+                st.caption(
+                    f"💾 결과 캐시: 적중 {stats['hits']} · 미스 {stats['misses']} · "
+                    f"{stats['size']}/{stats['max_entries']}건 · 퇴출 {stats['evictions']}"
+                )
+                flight_stats = get_single_flight().stats()
+                st.caption(
+                    f"🔗 요청 병합: 업스트림 {flight_stats['leaders']} · 병합 {flight_stats['coalesced']} · "
+                    f"진행 중 {flight_stats['in_flight']}"
+                )
+                prefetch_stats = get_prefetcher().stats()
+                st.caption(
+                    f"📈 재무제표 선조회: 요청 {prefetch_stats['issued']} · 완료 {prefetch_stats['completed']} · "
+                    f"취소 {prefetch_stats['cancelled']} · 적중 {prefetch_stats['hits']} "
+                    f"({prefetch_stats['hit_rate']:.0%})"
+                )
+                client = get_search_client()
+                for route, lat in client.latency.stats().items():
+                    if lat["p50"] is None:
+                        st.caption(f"⏳ {route}: 표본 {lat['samples']}건 · 타임아웃 {lat['timeout']:.1f}s")
+                    else:
+                        st.caption(
+                            f"⏳ {route}: p50 {lat['p50'] * 1000:.0f}ms · p95 {lat['p95'] * 1000:.0f}ms · "
+                            f"p99 {lat['p99'] * 1000:.0f}ms · 타임아웃 {lat['timeout']:.1f}s"
+                        )
+                if client.hedge:
+                    st.caption(f"🪝 헤지 요청 {client.hedged}건 · 헤지 승 {client.hedge_wins}건")
+                phase_summary = get_metrics().summary()
+                if phase_summary:
+                    st.caption("🧭 평균 단계별 지연: " + " · ".join(
+                        f"{phase} {agg['mean_ms']:.0f}ms" for phase, agg in phase_summary.items()
+                    ))
+                    with st.expander("📈 메트릭 (Prometheus)", expanded=False):
+                        st.code(get_metrics().render_prometheus(), language="text")
+                usage = get_payload_store().usage(st.session_state.session_key)
+                st.caption(
+                    f"🗄 원본 저장소: {usage['count']}건 · "
+                    f"{usage['bytes'] / 1024:,.0f}KB / {usage['cap_bytes'] / 1024 / 1024:,.0f}MB"
+                )
+                name_stats = get_name_directory().stats()
+                index = get_name_directory().index(current_scope())
+                st.caption(
+                    f"📇 기업명 인덱스: {len(index):,}개 · 로컬 응답 {name_stats['local_hits']} · "
+                    f"이름 교정 {name_stats['rewrites']} · 스냅샷 {index.version or '-'} · "
+                    f"실패 {name_stats['refresh_failures']}"
+                )
+                snapshot = get_snapshot_store().get(current_scope())
+                if snapshot is not None:
+                    snapshot_stats = get_snapshot_store().stats()
+                    refreshed = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.refreshed))
+                    st.caption(
+                        f"💽 스냅샷: 버전 {snapshot.version or '-'} · 갱신 {refreshed} · {len(snapshot):,}개 · "
+                        f"로컬 응답 {snapshot_stats['local_hits']} · 서버로 {snapshot_stats['fallbacks']} · "
+                        f"만료 {snapshot_stats['stale']}"
+                    )
+                cache_cols = st.columns([3, 1])
+                scope_alias = cache_cols[0].selectbox(
+                    "캐시 무효화 대상", ["admin"] + list(WORKSPACE_ALIASES), label_visibility="collapsed"
+                )
+                if cache_cols[1].button("캐시 비우기"):
+                    scope = WORKSPACE_ALIASES.get(scope_alias, ADMIN_SCOPE)
+                    removed = cache.invalidate_workspace(scope)
+                    st.toast(f"{scope_alias} 캐시 {removed}건 삭제")
+
+        # 채팅 히스토리 표시
+        render_history(st.session_state.messages)
+
+        # 대화 중 조회한 재무제표 전체 비교
+        panel = get_financial_panel(st.session_state.messages)
+        if panel is not None:
+            companies, periods = panel.shape
+            with st.expander(f"📊 재무제표 비교 (기업 {companies}곳 × 기간 {periods}개)", expanded=False):
+                render_financial_comparison(panel, key="session")
+
+        # 기업명 자동 완성: 앞글자로 인덱스 접두어 검색, 후보를 고르면 바로 검색
+        refresh_snapshot()
+        prefix = st.text_input(
+            "기업명 바로 찾기", key="name_prefix", placeholder="🔎 기업명 앞글자 입력 후 Enter",
+            label_visibility="collapsed",
+        )
+        if prefix.strip():
+            matches = get_name_directory().index(current_scope()).complete(prefix, limit=TYPEAHEAD_LIMIT)
+            if matches:
+                st.pills(
+                    "기업명 후보", matches, key="name_typeahead", on_change=pick_typeahead,
+                    label_visibility="collapsed",
+                )
+            else:
+                st.caption("일치하는 기업명이 없습니다.")
+
+        # 채팅 입력
+        prompt = st.chat_input("검색어를 입력하세요...") or st.session_state.pop("pending_prompt", None)
+        if prompt:
+            # 이전 결과 기준 선조회는 새 질문과 같은 쿼리만 남기고 취소
+            get_prefetcher().cancel(st.session_state.session_key, keep=prompt)
+
+            # 사용자 메시지 추가
+            st.session_state.messages.append({"role": "user", "content": prompt})
+            with st.chat_message("user"):
+                st.markdown(prompt)
+
+            queries = split_query(prompt) if st.session_state.get("multi_query") else [prompt]
+
+            # API 호출 및 응답
+            with st.chat_message("assistant"):
+                with st.spinner("검색 중..."):
+                    try:
+                        if len(queries) > 1:
+                            run_fanout(queries, start_search_request())
+                        else:
+                            timer = TurnTimer()
+                            turn_started = time.perf_counter()
+                            view = StreamingStartupView()
+                            cancel = start_search_request()
+                            result, query = resolve_local(prompt)
+                            if result is None:
+                                result = call_search_api(query, on_event=view.on_event, cancel=cancel)
+                            get_prefetcher().note_result(query, current_workspace_id(), result)
+                            msg = {"role": "assistant", "query": query, **result}
+                            freeze_message(msg, timer)
+                            st.session_state.messages.append(msg)
+                            with timer.phase("render"):
+                                view.finish(
+                                    msg["data"], msg["status"], key=len(st.session_state.messages) - 1,
+                                    summary=msg.get("summary"),
+                                )
+                            timer.add("render", view.render_ms)
+                            timer.add("total", (time.perf_counter() - turn_started) * 1000)
+                            record_turn_metrics(msg, timer)
+
+                            if result["status"] == 200 and result["data"].get("type") is None:
+                                prefetch_financials(result["data"])
+
+                            if st.session_state.debug_mode:
+                                render_debug(msg)
+
+                    except search_client.SearchCancelled:
+                        st.caption("새 검색으로 이전 요청이 취소되었습니다.")
+                    except requests.Timeout:
+                        st.error("요청 시간 초과. 다시 시도해주세요.")
+                    except requests.RequestException as e:
+                        st.error(f"네트워크 오류: {e}")
+                    except Exception as e:
+                        st.error(f"오류 발생: {e}")
+
+
+if __name__ == "__main__":
+    main()
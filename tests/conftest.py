@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 루트의 앱 모듈을 그대로 import (패키지가 아니므로 경로 추가)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,21 @@
+from analytics_table import AnalyticsTable, rows_to_table
+
+ROWS = [
+    {"industry": "AI", "region": "서울", "count": 3},
+    {"industry": None, "region": "부산", "count": 2},
+    {"industry": None, "region": "서울", "count": 1},
+]
+
+
+def test_group_counts_rows_including_null_key():
+    view = AnalyticsTable(ROWS).view(group_by="industry", sort_by="건수", descending=True)
+    assert view.to_pylist() == [
+        {"industry": None, "건수": 2, "count 합계": 3},
+        {"industry": "AI", "건수": 1, "count 합계": 3},
+    ]
+
+
+def test_mixed_type_column_becomes_string():
+    table = rows_to_table([{"value": 1}, {"value": "1억"}, {"other": True}])
+    assert table.column("value").to_pylist() == ["1", "1억", None]
+    assert table.column("other").to_pylist() == [None, None, True]
@@ -0,0 +1,82 @@
+import csv
+import os
+import threading
+
+import pytest
+import requests
+
+from export import ExportJob
+
+
+def pages(*sizes):
+    return ([{"name": f"{n}-{i}"} for i in range(size)] for n, size in enumerate(sizes))
+
+
+def test_limit_passes_pages_under_cap():
+    job = ExportJob("CSV", max_rows=100)
+    assert [len(page) for page in job._limit(pages(40, 40))] == [40, 40]
+    assert job.rows == 80 and not job.truncated
+
+
+def test_limit_truncates_at_cap_and_stops_paging():
+    fetched = []
+
+    def tracked():
+        for page in pages(40, 40, 40):
+            fetched.append(page)
+            yield page
+
+    job = ExportJob("CSV", max_rows=50)
+    assert [len(page) for page in job._limit(tracked())] == [40, 10]
+    assert job.rows == 50 and job.truncated
+    assert len(fetched) == 2
+
+
+def test_limit_without_cap():
+    job = ExportJob("CSV", max_rows=None)
+    assert sum(len(page) for page in job._limit(pages(500, 500))) == 1000
+    assert not job.truncated
+
+
+def test_run_writes_file_and_discard_removes_it():
+    job = ExportJob("CSV", max_rows=3)
+    job.run(pages(2, 2), {})
+    assert job.done and job.error is None
+    with open(job.path, encoding="utf-8-sig") as f:
+        assert len(list(csv.reader(f))) == 1 + 3
+    path = job.path
+    job.discard()
+    assert not os.path.exists(path)
+
+
+def test_run_records_paging_error():
+    def failing():
+        yield [{"name": "a"}]
+        raise requests.HTTPError("HTTP 502")
+
+    job = ExportJob("CSV")
+    job.run(failing(), {})
+    assert job.done and job.path is None
+    assert job.rows == 1 and job.error == "HTTP 502"
+
+
+def test_discard_while_running_stops_and_leaves_no_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    first_page, resume = threading.Event(), threading.Event()
+
+    def slow():
+        yield [{"name": "a"}]
+        first_page.set()
+        resume.wait(5)
+        yield [{"name": "b"}]
+        pytest.fail("취소 후에도 다음 페이지를 요청함")
+
+    job = ExportJob("CSV")
+    worker = threading.Thread(target=job.run, args=(slow(), {}))
+    worker.start()
+    first_page.wait(5)
+    job.discard()
+    resume.set()
+    worker.join(5)
+    assert job.cancelled and job.path is None
+    assert list(tmp_path.iterdir()) == []
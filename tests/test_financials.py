@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from financials import FinancialPanel
+
+FIELDS = ["revenue", "gross_profit", "operating_profit", "net_income", "total_liabilities", "total_equity", "capital"]
+
+
+def statement(name, year, quarter="Q4", **values):
+    return {"company": {"name": name}, "period": {"year": year, "quarter": quarter}, "summary": values}
+
+
+def test_ratios_per_company_and_period():
+    panel = FinancialPanel(
+        [
+            statement("토스", 2023, revenue=100, gross_profit=40, operating_profit=10, net_income=5,
+                      total_liabilities=50, total_equity=100, capital=80),
+            statement("토스", 2024, revenue=150, gross_profit=60, operating_profit=-15, net_income=0,
+                      total_liabilities=90, total_equity=60, capital=80),
+        ],
+        FIELDS,
+    )
+    ratios = panel.ratios()
+    assert panel.shape == (1, 2)
+    np.testing.assert_allclose(ratios["gross_margin"], [[0.4, 0.4]])
+    np.testing.assert_allclose(ratios["operating_margin"], [[0.1, -0.1]])
+    np.testing.assert_allclose(ratios["debt_ratio"], [[0.5, 1.5]])
+    # 자본총계가 자본금 이상이면 0, 미만이면 잠식 비율
+    np.testing.assert_allclose(ratios["impairment_ratio"], [[0.0, 0.25]])
+    assert np.isnan(ratios["revenue_yoy"][0, 0])
+    assert ratios["revenue_yoy"][0, 1] == pytest.approx(0.5)
+
+
+def test_ratios_missing_or_zero_denominators_are_nan():
+    panel = FinancialPanel(
+        [
+            statement("A", 2024, revenue=0, gross_profit=10),
+            statement("B", 2024, gross_profit=10, total_equity=0, total_liabilities=5),
+        ],
+        FIELDS,
+    )
+    ratios = panel.ratios()
+    assert np.isnan(ratios["gross_margin"]).all()
+    assert np.isnan(ratios["debt_ratio"]).all()
+
+
+def test_yoy_matches_same_quarter_only():
+    panel = FinancialPanel(
+        [
+            statement("A", 2023, "Q2", revenue=100),
+            statement("A", 2024, "Q1", revenue=300),
+            statement("A", 2024, "Q2", revenue=120),
+        ],
+        FIELDS,
+    )
+    yoy = panel.ratios()["revenue_yoy"][0]
+    assert np.isnan(yoy[0]) and np.isnan(yoy[1])
+    assert yoy[2] == pytest.approx(0.2)
@@ -0,0 +1,164 @@
+import threading
+import time
+import types
+
+import pytest
+
+import result_cache
+from result_cache import FlightAborted, ResultCache, SingleFlight
+
+
+def ok(kind=None, **data):
+    return {"status": 200, "data": {"type": kind, **data} if kind else data}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """result_cache가 보는 monotonic 시계를 직접 움직임"""
+    now = [1000.0]
+    monkeypatch.setattr(result_cache, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_cache_expires_after_type_ttl(clock):
+    cache = ResultCache(ttls={"startup": 10, "analytics": 1})
+    cache.put("ws", "핀테크", ok(results=[1]))
+    cache.put("ws", "통계", ok("analytics"))
+    clock[0] += 5
+    assert cache.get("ws", "핀테크") is not None
+    assert cache.get("ws", "통계") is None
+    clock[0] += 5
+    assert cache.get("ws", "핀테크") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_skips_errors_and_zero_ttl():
+    cache = ResultCache(ttls={"web": 0})
+    cache.put("ws", "q", {"status": 500, "data": {}})
+    cache.put("ws", "뉴스", ok("web"))
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("ws", "a", ok(results=["a"]))
+    cache.put("ws", "b", ok(results=["b"]))
+    assert cache.get("ws", "a") is not None  # a가 최근 사용
+    cache.put("ws", "c", ok(results=["c"]))
+    assert cache.get("ws", "b") is None
+    assert cache.get("ws", "a") is not None
+    assert cache.get("ws", "c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_key_normalizes_query_and_pages():
+    cache = ResultCache()
+    cache.put("ws", "  핀테크   서울 ", ok(results=[1]), offset=0, limit=20)
+    assert cache.get("ws", "핀테크 서울", offset=0, limit=20) is not None
+    assert cache.get("ws", "핀테크 서울", offset=20, limit=20) is None
+
+
+def test_cache_isolates_workspaces():
+    cache = ResultCache()
+    cache.put("ws1", "q", ok(results=["ws1"]))
+    cache.put("ws2", "q", ok(results=["ws2"]))
+    assert cache.get("ws1", "q")["data"]["results"] == ["ws1"]
+    assert cache.get("admin", "q") is None
+    assert cache.invalidate_workspace("ws1") == 1
+    assert cache.get("ws1", "q") is None
+    assert cache.get("ws2", "q") is not None
+
+
+def start_follower(flights, key, fn, abort=None):
+    """같은 키로 합류하는 요청을 스레드로 실행. 반환: (스레드, 결과 목록)"""
+    out = []
+
+    def run():
+        try:
+            out.append(flights.do(key, fn, abort))
+        except BaseException as e:
+            out.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    while flights.stats()["coalesced"] == 0:
+        time.sleep(0.01)
+    return thread, out
+
+
+def lead(flights, key, release: threading.Event, outcome):
+    """release될 때까지 붙잡고 있는 선행 호출을 스레드로 실행"""
+    out = []
+
+    def fn():
+        release.wait(5)
+        return outcome()
+
+    def run():
+        try:
+            out.append(flights.do(key, fn))
+        except BaseException as e:
+            out.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    while flights.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+    return thread, out
+
+
+def test_single_flight_shares_result():
+    flights, release = SingleFlight(), threading.Event()
+    leader, leader_out = lead(flights, "k", release, lambda: "결과")
+    follower, follower_out = start_follower(flights, "k", lambda: "다시 호출됨")
+    release.set()
+    leader.join()
+    follower.join()
+    assert leader_out == [("결과", False)]
+    assert follower_out == [("결과", True)]
+
+
+def test_single_flight_shares_error():
+    flights, release = SingleFlight(), threading.Event()
+
+    def fail():
+        raise ValueError("업스트림 오류")
+
+    leader, leader_out = lead(flights, "k", release, fail)
+    follower, follower_out = start_follower(flights, "k", lambda: "다시 호출됨")
+    release.set()
+    leader.join()
+    follower.join()
+    assert isinstance(leader_out[0], ValueError)
+    assert follower_out[0] is leader_out[0]
+
+
+def test_single_flight_retries_after_leader_abort():
+    flights, release = SingleFlight(), threading.Event()
+
+    def abort():
+        raise FlightAborted()
+
+    leader, leader_out = lead(flights, "k", release, abort)
+    follower, follower_out = start_follower(flights, "k", lambda: "직접 호출")
+    release.set()
+    leader.join()
+    follower.join()
+    assert isinstance(leader_out[0], FlightAborted)
+    # 중단된 결과를 공유하지 않고 대기자가 직접 다시 호출
+    assert follower_out == [("직접 호출", False)]
+    assert flights.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 1}
+
+
+def test_single_flight_waiter_can_give_up():
+    flights, release = SingleFlight(), threading.Event()
+    leader, _ = lead(flights, "k", release, lambda: "결과")
+
+    def give_up():
+        raise FlightAborted()
+
+    follower, follower_out = start_follower(flights, "k", lambda: None, abort=give_up)
+    follower.join(5)
+    assert isinstance(follower_out[0], FlightAborted)
+    release.set()
+    leader.join()
@@ -0,0 +1,48 @@
+from result_index import ResultIndex
+
+COMPANIES = [
+    {"name": "다", "industry": "핀테크", "region": "서울", "pre_money_valuation": 30, "investment_date": "2023-01-01"},
+    {"name": "가", "industry": "AI", "region": "서울", "pre_money_valuation": 10, "has_exit": True},
+    {"name": "나", "industry": "핀테크", "region": "부산", "investment_date": "2024-01-01"},
+    {"name": "라", "industry": "헬스케어", "region": "", "pre_money_valuation": 20},
+]
+
+
+def names(results):
+    return [c["name"] for c in results]
+
+
+def test_query_without_conditions_keeps_order():
+    assert names(ResultIndex(COMPANIES).query()) == ["다", "가", "나", "라"]
+
+
+def test_query_or_within_field_and_across_fields():
+    index = ResultIndex(COMPANIES)
+    assert names(index.query({"industry": {"핀테크", "AI"}, "region": {"서울"}})) == ["다", "가"]
+    assert names(index.query({"industry": {"핀테크"}, "region": set()})) == ["다", "나"]
+    assert index.query({"industry": {"없는 산업"}}) == []
+
+
+def test_query_flags_default_to_false():
+    index = ResultIndex(COMPANIES)
+    assert names(index.query({"has_exit": {True}})) == ["가"]
+    assert names(index.query({"has_exit": {False}})) == ["다", "나", "라"]
+
+
+def test_query_valuation_range_is_inclusive():
+    index = ResultIndex(COMPANIES)
+    assert names(index.query(valuation_range=(10, 20))) == ["가", "라"]
+    assert index.valuation_bounds() == (10, 30)
+
+
+def test_query_sort_puts_missing_values_last():
+    index = ResultIndex(COMPANIES)
+    assert names(index.query(sort_by="pre_money_valuation")) == ["가", "라", "다", "나"]
+    assert names(index.query(sort_by="pre_money_valuation", descending=True)) == ["다", "라", "가", "나"]
+    assert names(index.query({"industry": {"핀테크"}}, sort_by="investment_date", descending=True)) == ["나", "다"]
+
+
+def test_values_by_frequency_ignores_empty():
+    index = ResultIndex(COMPANIES)
+    assert index.values("industry") == ["핀테크", "AI", "헬스케어"]
+    assert index.values("region") == ["서울", "부산"]
@@ -0,0 +1,39 @@
+import pytest
+import requests
+
+from search_client import MIN_TIMEOUT, TIMEOUT_MULTIPLIER, LatencyTracker, decode_json
+
+
+def test_timeout_uses_max_until_enough_samples():
+    tracker = LatencyTracker(max_timeout=30)
+    for _ in range(5):
+        tracker.observe("startup", 0.5)
+    assert tracker.timeout("startup") == 30
+    assert tracker.hedge_delay("startup") is None
+
+
+def test_timeout_scales_p99_within_bounds():
+    tracker = LatencyTracker(max_timeout=30)
+    for _ in range(100):
+        tracker.observe("startup", 0.1)
+        tracker.observe("analytics", 4.0)
+        tracker.observe("financial", 50.0)
+    # 빠른 경로는 최소값, 느린 경로는 최대값으로 제한
+    assert tracker.timeout("startup") == MIN_TIMEOUT
+    assert tracker.timeout("analytics") == pytest.approx(4.0 * TIMEOUT_MULTIPLIER)
+    assert tracker.timeout("financial") == 30
+
+
+def test_timeout_tracks_recent_window():
+    tracker = LatencyTracker(max_timeout=60, window=50)
+    for _ in range(50):
+        tracker.observe("startup", 15.0)
+    for _ in range(50):
+        tracker.observe("startup", 3.0)
+    assert tracker.timeout("startup") == pytest.approx(3.0 * TIMEOUT_MULTIPLIER)
+
+
+def test_decode_json_raises_request_exception_for_non_json():
+    with pytest.raises(requests.RequestException):
+        decode_json(b"<html>502 Bad Gateway</html>", {})
+    assert decode_json(b'{"results": []}') == {"results": []}
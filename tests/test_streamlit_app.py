@@ -0,0 +1,28 @@
+import pytest
+
+from benchmarks.bench import load_app
+
+
+@pytest.fixture(scope="module")
+def app():
+    return load_app()
+
+
+@pytest.mark.parametrize(
+    "prompt, expected",
+    [
+        ("토스 vs 카카오페이 재무제표", ["토스 재무제표", "카카오페이 재무제표"]),
+        ("핀테크 and 헬스케어 in 서울", ["핀테크 서울", "헬스케어 서울"]),
+        ("토스 vs 토스", ["토스"]),
+        ("핀테크 시리즈A", ["핀테크 시리즈A"]),
+    ],
+)
+def test_split_query(app, prompt, expected):
+    assert app.split_query(prompt) == expected
+
+
+def test_split_query_keeps_suffix_beyond_fanout_limit(app):
+    # 개수 제한은 run_fanout에서 적용하므로 공통 조건이 모든 항목에 붙어야 함
+    queries = app.split_query("A vs B vs C vs D vs E 재무제표")
+    assert queries == ["A 재무제표", "B 재무제표", "C 재무제표", "D 재무제표", "E 재무제표"]
+    assert len(queries) > app.MAX_FANOUT
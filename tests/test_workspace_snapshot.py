@@ -0,0 +1,56 @@
+import pytest
+
+from workspace_snapshot import STAGE_LABELS, WorkspaceSnapshot
+
+COMPANIES = [
+    {"name": "가", "industry": "핀테크", "region": "서울", "round": "series_a", "stage": "portfolio", "has_exit": True},
+    {"name": "나", "industry": "핀테크", "region": "부산", "round": "seed", "stage": "review"},
+    {"name": "다", "industry": "AI", "region": "서울", "round": "series_a", "stage": "discovery",
+     "is_capital_impaired": True},
+]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return WorkspaceSnapshot(COMPANIES)
+
+
+def test_parse_values_and_fillers(snapshot):
+    filters, matched = snapshot.parse("서울 핀테크 기업 목록")
+    assert filters == {"region": {"서울"}, "industry": {"핀테크"}}
+    assert matched == {"region": "서울", "industry": "핀테크"}
+
+
+def test_parse_korean_aliases(snapshot):
+    filters, matched = snapshot.parse("서울 시리즈A")
+    assert filters == {"region": {"서울"}, "round": {"series_a"}}
+    assert snapshot.parse("포트폴리오")[0] == {"stage": {"portfolio"}}
+    assert snapshot.parse("검토중")[0] == {"stage": {"review"}}
+
+
+def test_stage_aliases_cover_every_stage_label():
+    snapshot = WorkspaceSnapshot([{"name": str(i), "stage": code} for i, code in enumerate(STAGE_LABELS)])
+    for code, label in STAGE_LABELS.items():
+        assert snapshot.parse(label)[0] == {"stage": {code}}
+
+
+def test_parse_alias_without_value_goes_to_server(snapshot):
+    # 스냅샷에 없는 라운드(시리즈B)는 로컬에서 답하지 않음
+    assert snapshot.parse("시리즈B") is None
+
+
+def test_parse_keywords_and_same_field_or(snapshot):
+    filters, matched = snapshot.parse("서울 부산 자본잠식")
+    assert filters == {"region": {"서울", "부산"}, "is_capital_impaired": {True}}
+    assert matched == {"region": "서울, 부산", "capital_impairment": True}
+
+
+@pytest.mark.parametrize("query", ["서울 뉴스", "기업 목록", ""])
+def test_parse_rejects_unknown_or_empty(snapshot, query):
+    assert snapshot.parse(query) is None
+
+
+def test_search_returns_matching_companies(snapshot):
+    found = snapshot.search("서울 시리즈A")
+    assert [c["name"] for c in found["results"]] == ["가", "다"]
+    assert snapshot.search("서울 엑싯")["results"] == [COMPANIES[0]]
@@ -0,0 +1,149 @@
+"""워크스페이스 기업 스냅샷 + 로컬 조건 검색 (구조화 필터 질문만 서버 없이 처리)"""
+import threading
+import time
+
+from name_index import DEFAULT_SNAPSHOT_TTL, normalize_name
+from result_index import CATEGORY_FIELDS, ResultIndex
+
+# 질문 단어로 찾는 범주 필드 → matched_conditions 키
+QUERY_FIELDS = {field: field for field in CATEGORY_FIELDS if field != "ceo_gender"}
+
+# 투자 단계 코드 → 화면 표시 이름 (기업 서머리와 로컬 검색 별칭 공용)
+STAGE_LABELS = {
+    "discovery": "발굴",
+    "review": "검토",
+    "due_diligence": "실사",
+    "investment": "투자",
+    "portfolio": "포트폴리오",
+}
+
+# 저장값이 영문 코드인 필드의 한글 별칭: 필드 → {별칭: 저장값}
+VALUE_ALIASES = {
+    "round": {
+        "시드": "seed",
+        "프리A": "pre_a",
+        "프리시리즈A": "pre_a",
+        "시리즈A": "series_a",
+        "시리즈B": "series_b",
+        "시리즈C": "series_c",
+        "시리즈D": "series_d",
+        "브릿지": "bridge",
+    },
+    "stage": {
+        **{label: code for code, label in STAGE_LABELS.items()},
+        "소싱": "discovery",
+        "검토중": "review",
+        "투자완료": "portfolio",
+    },
+}
+
+# 값 대신 키워드로 찾는 조건: 키워드 → (필터 필드, 값, matched_conditions 키)
+KEYWORD_FILTERS = {
+    "자본잠식": ("is_capital_impaired", True, "capital_impairment"),
+    "엑싯": ("has_exit", True, "has_exit"),
+    "여성대표": ("ceo_gender", "F", "ceo_gender"),
+    "남성대표": ("ceo_gender", "M", "ceo_gender"),
+}
+
+# 조건 없이 붙는 단어 (있어도 순수 조건 검색으로 봄)
+FILLER_WORDS = {"기업", "기업들", "회사", "스타트업", "목록", "리스트", "전체"}
+
+
+class WorkspaceSnapshot:
+    """워크스페이스 기업 전체(렌더링 필드만) + 역인덱스 + 질문 단어 사전 (생성 후 읽기 전용)"""
+
+    def __init__(self, companies: list, version: str | None = None):
+        self.version = version
+        self.refreshed = time.time()
+        self.index = ResultIndex(companies)
+        self._vocabulary = {}  # 정규화 단어 -> (필터 필드, 값, matched_conditions 키)
+        for field, condition in QUERY_FIELDS.items():
+            for value in self.index.postings[field]:
+                if isinstance(value, str):
+                    self._vocabulary.setdefault(normalize_name(value), (field, value, condition))
+            # 스냅샷에 있는 값만 별칭 등록 (없는 값이면 서버로)
+            for alias, value in VALUE_ALIASES.get(field, {}).items():
+                if value in self.index.postings[field]:
+                    self._vocabulary.setdefault(normalize_name(alias), (field, value, condition))
+        for keyword, rule in KEYWORD_FILTERS.items():
+            self._vocabulary.setdefault(normalize_name(keyword), rule)
+
+    def __len__(self) -> int:
+        return len(self.index.results)
+
+    def parse(self, query: str) -> tuple | None:
+        """모든 단어가 조건/불용어면 (filters, matched_conditions), 하나라도 모르면 None (서버로)"""
+        filters, conditions = {}, {}
+        for word in query.split():
+            key = normalize_name(word.strip("?!.,"))
+            if key in FILLER_WORDS:
+                continue
+            if key not in self._vocabulary:
+                return None
+            field, value, condition = self._vocabulary[key]
+            filters.setdefault(field, set()).add(value)
+            conditions.setdefault(condition, []).append(value)
+        if not filters:
+            return None
+        matched = {
+            k: v[0] if isinstance(v[0], bool) else ", ".join(dict.fromkeys(v)) for k, v in conditions.items()
+        }
+        return filters, matched
+
+    def search(self, query: str) -> dict | None:
+        """순수 조건 질문이면 {"results", "matched_conditions"}, 아니면 None"""
+        parsed = self.parse(query)
+        if parsed is None:
+            return None
+        filters, matched = parsed
+        return {"results": self.index.query(filters), "matched_conditions": matched}
+
+
+class SnapshotStore:
+    """범위(워크스페이스 / admin)별 최신 WorkspaceSnapshot. 스레드 안전."""
+
+    def __init__(self, ttl: float = DEFAULT_SNAPSHOT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self.local_hits = 0
+        self.stale = 0
+        self.fallbacks = 0
+
+    def load(self, scope: str, companies: list, version: str | None = None):
+        """새 스냅샷으로 교체 (인덱스는 잠금 밖에서 생성)"""
+        snapshot = WorkspaceSnapshot(companies, version)
+        with self._lock:
+            self._snapshots[scope] = snapshot
+
+    def get(self, scope: str) -> WorkspaceSnapshot | None:
+        with self._lock:
+            return self._snapshots.get(scope)
+
+    def fresh(self, scope: str) -> WorkspaceSnapshot | None:
+        """TTL 안의 스냅샷 (없거나 오래됐으면 None)"""
+        snapshot = self.get(scope)
+        if snapshot is None:
+            return None
+        if time.time() - snapshot.refreshed >= self.ttl:
+            with self._lock:
+                self.stale += 1
+            return None
+        return snapshot
+
+    def search(self, scope: str, query: str) -> tuple | None:
+        """로컬 조건 검색. 반환: (스냅샷, 검색 결과) 또는 None (서버로)"""
+        snapshot = self.fresh(scope)
+        if snapshot is None:
+            return None
+        found = snapshot.search(query)
+        with self._lock:
+            if found is None:
+                self.fallbacks += 1
+            else:
+                self.local_hits += 1
+        return None if found is None else (snapshot, found)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"local_hits": self.local_hits, "stale": self.stale, "fallbacks": self.fallbacks}